@@ -1,6 +1,10 @@
 import os
+from sqlalchemy import Enum, delete, exists, func, inspect, literal, select, text, update
 from sqlmodel import SQLModel, create_engine, Session
 
+from .models import Project, ProjectRating, TeacherVerification, User, VerificationStatus
+from .services.ratings import rating_summary_values
+
 sqlite_file_name = "database.db"
 default_db_url = f"sqlite:///{sqlite_file_name}"
 database_url = os.environ.get("DATABASE_URL", default_db_url)
@@ -8,10 +12,121 @@ database_url = os.environ.get("DATABASE_URL", default_db_url)
 # Only use check_same_thread for SQLite
 connect_args = {"check_same_thread": False} if "sqlite" in database_url else {}
 
-engine = create_engine(database_url, echo=False, connect_args=connect_args)
+# These limits are per process: every uvicorn/gunicorn worker opens its own pool,
+# so workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay below the server's
+# max_connections (or PgBouncer's pool, which DATABASE_URL may point at).
+# The pool is deliberately smaller than THREADPOOL_WORKERS; handlers beyond it
+# wait up to pool_timeout. A request can hold two connections at once, since
+# streamed listings and refund background tasks open their own session while
+# the request-scoped one is still alive. SQLite keeps SQLAlchemy's defaults.
+pool_args = {} if "sqlite" in database_url else {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": 30,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
+
+engine = create_engine(database_url, echo=False, connect_args=connect_args, **pool_args)
+
+# Indexes since removed from the models, dropped from databases created before then
+_RETIRED_INDEXES = (
+    "project_teacher_id_idx",
+    "project_teacher_idx",
+    "project_listing_idx",
+    "project_status_created_idx",
+)
 
 def create_db_and_tables():
+    if engine.dialect.name == "postgresql":
+        # The trigram search indexes depend on pg_trgm
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     SQLModel.metadata.create_all(engine)
+    if engine.dialect.name == "postgresql":
+        # create_all leaves existing enum types alone, so add values introduced since
+        # (such as ProjectStatus.TRANSFER_PENDING). ADD VALUE can't run in a transaction before Postgres 12.
+        enum_types = {
+            column.type.name: column.type.enums
+            for table in SQLModel.metadata.tables.values()
+            for column in table.columns
+            if isinstance(column.type, Enum) and column.type.native_enum
+        }
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for type_name, values in enum_types.items():
+                for value in values:
+                    conn.execute(text(f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS '{value}'"))
+    _add_missing_columns()
+    _dedupe_project_ratings()
+    with engine.begin() as conn:
+        for index_name in _RETIRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    # create_all only builds indexes alongside new tables, so make sure indexes
+    # added to existing tables are created as well
+    for table in SQLModel.metadata.tables.values():
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+def _add_missing_columns():
+    """
+    Adds model columns that existing tables lack, since create_all only creates
+    whole tables. Denormalized columns are then filled in from the rows they summarise.
+    """
+    rating_summary = rating_summary_values()
+    # Backfills are not edits, so they keep each project's updated_at
+    backfills = {
+        Project.__table__.c.average_rating: update(Project).values(
+            average_rating=rating_summary["average_rating"], updated_at=Project.updated_at,
+        ),
+        Project.__table__.c.total_ratings: update(Project).values(
+            total_ratings=rating_summary["total_ratings"], updated_at=Project.updated_at,
+        ),
+        User.__table__.c.is_verified_teacher: update(User).values(
+            is_verified_teacher=exists().where(
+                TeacherVerification.teacher_id == User.id,
+                TeacherVerification.status == VerificationStatus.APPROVED,
+            )
+        ),
+    }
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.tables.values():
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg, column.type).compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                    ddl += f" DEFAULT {default}" + ("" if column.nullable else " NOT NULL")
+                conn.execute(text(ddl))
+                if column in backfills:
+                    conn.execute(backfills[column])
+
+def _dedupe_project_ratings():
+    """
+    Keeps only the earliest rating per (project, user) so the unique
+    project_rating_project_user_idx can be built. Duplicates come from the old
+    check-then-insert race and from account deletion moving ratings onto the
+    shared placeholder user. The summaries of affected projects are recomputed.
+    """
+    if any(index["name"] == "project_rating_project_user_idx" for index in inspect(engine).get_indexes(ProjectRating.__tablename__)):
+        return
+    with engine.begin() as conn:
+        duplicated = conn.execute(
+            select(ProjectRating.project_id).distinct()
+            .group_by(ProjectRating.project_id, ProjectRating.user_id)
+            .having(func.count(ProjectRating.id) > 1)
+        ).scalars().all()
+        if not duplicated:
+            return
+        kept = select(func.min(ProjectRating.id)).group_by(ProjectRating.project_id, ProjectRating.user_id)
+        conn.execute(delete(ProjectRating).where(ProjectRating.project_id.in_(duplicated), ProjectRating.id.not_in(kept)))
+        conn.execute(
+            update(Project).where(Project.id.in_(duplicated))
+            .values(**rating_summary_values(), updated_at=Project.updated_at)
+        )
 
 def get_session():
     with Session(engine) as session:
@@ -1,5 +1,5 @@
 from typing import Generator, Optional, Callable
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import BaseModel
@@ -18,6 +18,14 @@ reusable_oauth2_optional = OAuth2PasswordBearer(
     auto_error=False
 )
 
+def get_write_session(session: Session = Depends(get_session)) -> Session:
+    """
+    Returns the request session set to keep loaded objects after commit, for
+    write endpoints that only serialize the rows they just wrote.
+    """
+    session.expire_on_commit = False
+    return session
+
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
 
@@ -64,6 +72,25 @@ def get_current_user_optional(
     user = session.get(User, user_id)
     return user
 
+PUBLIC_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=300"
+
+def public_cache_headers(response: Response):
+    """
+    Lets browsers and CDNs cache a GET response that is the same for every user.
+    """
+    response.headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+
+def anonymous_cache_headers(
+    response: Response,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    """
+    Lets browsers and CDNs cache a GET response with per-user fields, but only for anonymous requests.
+    """
+    response.headers["Vary"] = "Authorization"
+    if current_user is None:
+        response.headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+
 def get_current_admin(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -74,6 +101,16 @@ def get_current_admin(
         )
     return current_user
 
+def get_current_teacher_or_admin(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    if current_user.role not in (UserRole.TEACHER, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only teachers can manage projects",
+        )
+    return current_user
+
 def require_role(role: UserRole) -> Callable[[User], User]:
     """
     Returns a dependency that requires the current user to have a specific role.
@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import Session, select
@@ -30,8 +31,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sync endpoints run on AnyIO's worker threads, which default to 40 per process
+THREADPOOL_WORKERS = int(os.environ.get("THREADPOOL_WORKERS", "100"))
+
 @app.on_event("startup")
 def on_startup():
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_WORKERS
     create_db_and_tables()
     
     with Session(engine) as session:
@@ -1,8 +1,13 @@
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import List, Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
+def _trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index serving ILIKE '%term%' searches. Postgres only, needs the pg_trgm extension."""
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+
 # Enums
 class UserRole(str, Enum):
     STUDENT = "student"
@@ -21,6 +26,7 @@ class ProjectStatus(str, Enum):
     FUNDING = "funding"
     SUCCESSFUL = "successful"
     PENDING_CONFIRMATION = "pending_confirmation"
+    TRANSFER_PENDING = "transfer_pending"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
     ON_HOLD = "on_hold"
@@ -30,6 +36,8 @@ class PledgeStatus(str, Enum):
     CAPTURED = "captured"
     REFUNDED = "refunded"
     PAID_BY_CREDIT = "paid_by_credit"
+    # Stripe rejected the refund; left for an admin rather than retried
+    REFUND_FAILED = "refund_failed"
 
 class RequestStatus(str, Enum):
     OPEN = "open"
@@ -86,6 +94,10 @@ class TeacherFollower(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class User(SQLModel, table=True):
+    __table_args__ = (
+        _trigram_index("user_full_name_trgm_idx", "full_name"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(unique=True, index=True)
     hashed_password: str
@@ -105,6 +117,9 @@ class User(SQLModel, table=True):
     subscription_tier: SubscriptionTier = Field(default=SubscriptionTier.NONE)
     subscription_expires_at: Optional[datetime] = None
 
+    # Denormalized from TeacherVerification, kept in sync when verifications are reviewed
+    is_verified_teacher: bool = Field(default=False)
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     deleted_at: Optional[datetime] = Field(default=None)
@@ -162,6 +177,36 @@ class TeacherVerification(SQLModel, table=True):
     teacher: "User" = Relationship(back_populates="verifications")
 
 class Project(SQLModel, table=True):
+    __table_args__ = (
+        # /projects/me lists every project of a teacher newest first, cancelled and private ones included
+        Index("project_teacher_created_idx", "teacher_id", "created_at", "id"),
+        # Partial indexes for the public listing (/projects) and archive (/projects/archive).
+        # current_funding stays out of every index so pledge updates remain HOT updates
+        Index(
+            "project_active_idx", "language", "level", "created_at",
+            postgresql_where=text("status IN ('FUNDING', 'SUCCESSFUL') AND is_private = false"),
+        ),
+        Index(
+            "project_completed_idx", "language", "level", "created_at",
+            postgresql_where=text("status = 'COMPLETED' AND is_private = false"),
+        ),
+        # Unfiltered pages of the same listings walk these in keyset order
+        Index(
+            "project_active_created_idx", "created_at", "id",
+            postgresql_where=text("status IN ('FUNDING', 'SUCCESSFUL') AND is_private = false"),
+        ),
+        Index(
+            "project_completed_created_idx", "created_at", "id",
+            postgresql_where=text("status = 'COMPLETED' AND is_private = false"),
+        ),
+        # The listing search ORs these together; every arm needs an index for a bitmap scan
+        _trigram_index("project_title_trgm_idx", "title"),
+        _trigram_index("project_description_trgm_idx", "description"),
+        _trigram_index("project_tags_trgm_idx", "tags"),
+        _trigram_index("project_language_trgm_idx", "language"),
+        _trigram_index("project_level_trgm_idx", "level"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     description: str
@@ -172,6 +217,10 @@ class Project(SQLModel, table=True):
     funding_goal: int
     current_funding: int = Field(default=0)
     total_tipped_amount: int = Field(default=0)
+
+    # Denormalized from ProjectRating, kept in sync when a rating is submitted
+    average_rating: Optional[float] = None
+    total_ratings: int = Field(default=0)
     
     deadline: Optional[datetime] = None
     delivery_days: Optional[int] = None
@@ -180,10 +229,12 @@ class Project(SQLModel, table=True):
     is_private: bool = Field(default=False)
     
     stripe_transfer_id: Optional[str] = None
+    # Part of the payout's idempotency key; bumped after a payout Stripe rejected
+    transfer_attempt: int = Field(default=0)
     origin_request_id: Optional[int] = Field(default=None, foreign_key="request.id")
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
     funded_at: Optional[datetime] = Field(default=None)
     completed_at: Optional[datetime] = Field(default=None)
     
@@ -235,6 +286,12 @@ class Video(SQLModel, table=True):
     resources: List["VideoResource"] = Relationship(back_populates="video")
 
 class ProjectRating(SQLModel, table=True):
+    __table_args__ = (
+        Index("project_rating_project_idx", "project_id", postgresql_include=["rating"]),
+        # One rating per backer; rate_project relies on it to reject duplicates
+        Index("project_rating_project_user_idx", "project_id", "user_id", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     rating: int
     comment: Optional[str] = None
@@ -261,6 +318,12 @@ class VideoComment(SQLModel, table=True):
     video: Optional[Video] = Relationship(back_populates="comments")
 
 class Pledge(SQLModel, table=True):
+    __table_args__ = (
+        Index("pledge_project_user_status_idx", "project_id", "user_id", "status"),
+        # Captured pledges of a project, for refunds, backer lists and completion notices
+        Index("pledge_project_status_idx", "project_id", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     amount: int
     status: PledgeStatus = Field(default=PledgeStatus.PENDING)
@@ -1,15 +1,16 @@
 from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlmodel import Session, select, func
 from pydantic import BaseModel
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 from ..database import get_session
-from ..deps import get_current_admin, get_current_user_optional
+from ..deps import get_current_admin, get_current_user_optional, get_write_session
 from ..models import User, Project, Pledge, UserRole, ProjectStatus, PledgeStatus, Request, Notification, TeacherVerification, VerificationStatus, RequestBlacklist
-from ..routers.projects import _cancel_project_logic, _create_project_read # Corrected import
+from ..routers.projects import _cancel_project_logic, _CANCEL_LOADERS, _UNCANCELLABLE_STATUSES, _project_listing_query, _anonymous_listing_cache, _stream_project_reads, _refund_stranded_pledges
 from ..schemas import ProjectRead # Corrected import
+from ..services.verification import sync_teacher_verified_flag, invalidate_verified_languages
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -85,53 +86,66 @@ def delete_user(
 
 @router.get("/projects", response_model=List[ProjectRead])
 def list_all_projects(
-    current_user: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    current_user: User = Depends(get_current_admin)
 ):
-    projects = session.exec(
-        select(Project)
-        .where(Project.status != ProjectStatus.CANCELLED) # Exclude cancelled projects
-        .options(selectinload(Project.teacher))
-    ).all()
-    return [_create_project_read(p, current_user, session) for p in projects]
+    return _stream_project_reads(
+        _project_listing_query()
+        .where(Project.status != ProjectStatus.CANCELLED), # Exclude cancelled projects
+        current_user
+    )
 
 @router.post("/projects/cleanup-abandoned")
 def cleanup_abandoned_projects(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     abandoned_projects = session.exec(
         select(Project)
         .join(User, Project.teacher_id == User.id)
         .where(User.deleted_at != None)
-        .where(Project.status.not_in([ProjectStatus.COMPLETED, ProjectStatus.CANCELLED]))
-        .options(selectinload(Project.pledges))
+        .where(Project.status.not_in(_UNCANCELLABLE_STATUSES))
+        .options(*_CANCEL_LOADERS)
+        .with_for_update(of=Project)
     ).all()
 
-    count = 0
+    # Refunds run after the response, one background task per project
     for project in abandoned_projects:
-        _cancel_project_logic(project, session)
-        count += 1
-    
+        _cancel_project_logic(project, session, background_tasks)
     session.commit()
+    count = len(abandoned_projects)
+    if count:
+        _anonymous_listing_cache.clear()
     
     return {"message": f"Successfully cancelled and refunded {count} abandoned projects."}
 
+@router.post("/pledges/refund-stranded")
+def refund_stranded_pledges(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Retries the refunds of pledges still captured on cancelled projects.
+    """
+    background_tasks.add_task(_refund_stranded_pledges)
+    return {"message": "Refunding captured pledges of cancelled projects in the background."}
+
 @router.delete("/projects/{project_id}")
 def admin_cancel_project(
     project_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    project = session.exec(select(Project).where(Project.id == project_id).options(selectinload(Project.pledges))).first()
+    project = session.get(Project, project_id, options=_CANCEL_LOADERS, with_for_update={"of": Project})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    if project.status in [ProjectStatus.COMPLETED, ProjectStatus.CANCELLED]:
+    if project.status in _UNCANCELLABLE_STATUSES:
         raise HTTPException(status_code=400, detail=f"Project is already {project.status.value} and cannot be cancelled.")
 
-    _cancel_project_logic(project, session)
+    _cancel_project_logic(project, session, background_tasks)
     session.commit()
-    session.refresh(project)
+    _anonymous_listing_cache.clear()
     return project
 
 @router.get("/verifications", response_model=List[VerificationRead])
@@ -139,7 +153,7 @@ def list_verifications(
     current_user: User = Depends(get_current_admin),
     session: Session = Depends(get_session)
 ):
-    statement = select(TeacherVerification).options(selectinload(TeacherVerification.teacher))
+    statement = select(TeacherVerification).options(joinedload(TeacherVerification.teacher))
     verifications = session.exec(statement).all()
     return [
         VerificationRead(
@@ -159,7 +173,7 @@ def list_verifications(
 def approve_verification(
     verification_id: int,
     current_user: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     verification = session.get(TeacherVerification, verification_id)
     if not verification:
@@ -167,6 +181,7 @@ def approve_verification(
     
     verification.status = VerificationStatus.APPROVED
     verification.reviewed_at = datetime.utcnow()
+    sync_teacher_verified_flag(verification.teacher_id, session)
     
     notification = Notification(
         user_id=verification.teacher_id,
@@ -176,7 +191,7 @@ def approve_verification(
     session.add(notification)
     session.add(verification)
     session.commit()
-    session.refresh(verification)
+    invalidate_verified_languages()
     return verification
 
 @router.post("/verifications/{verification_id}/reject", response_model=TeacherVerification)
@@ -184,7 +199,7 @@ def reject_verification(
     verification_id: int,
     rejection: VerificationReject,
     current_user: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     verification = session.get(TeacherVerification, verification_id)
     if not verification:
@@ -193,6 +208,7 @@ def reject_verification(
     verification.status = VerificationStatus.REJECTED
     verification.admin_notes = rejection.admin_notes
     verification.reviewed_at = datetime.utcnow()
+    sync_teacher_verified_flag(verification.teacher_id, session)
     
     rejection_note = f"Reason: {rejection.admin_notes}" if rejection.admin_notes else "No reason provided."
     notification = Notification(
@@ -203,5 +219,5 @@ def reject_verification(
     session.add(notification)
     session.add(verification)
     session.commit()
-    session.refresh(verification)
+    invalidate_verified_languages()
     return verification
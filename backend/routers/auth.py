@@ -4,6 +4,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
+from sqlalchemy import exists
 
 from ..database import get_session
 from ..models import User, UserRole
@@ -36,9 +37,7 @@ def register_user(
     Register a new user.
     """
     # Check if user already exists
-    statement = select(User).where(User.email == user_in.email)
-    existing_user = session.exec(statement).first()
-    if existing_user:
+    if session.exec(select(exists().where(User.email == user_in.email))).one():
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists",
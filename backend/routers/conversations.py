@@ -2,7 +2,7 @@ from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query
 from sqlmodel import Session, select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
 import json
 
 from ..database import get_session
@@ -266,9 +266,9 @@ def list_my_conversations(
         )
         .where(Conversation.status == ConversationStatus.OPEN)
         .options(
-            selectinload(Conversation.request),
-            selectinload(Conversation.teacher),
-            selectinload(Conversation.student)
+            joinedload(Conversation.request),
+            joinedload(Conversation.teacher),
+            joinedload(Conversation.student)
         )
         .order_by(Conversation.updated_at.desc())
     ).all()
@@ -288,9 +288,9 @@ def list_archived_conversations(
         )
         .where(Conversation.status == ConversationStatus.CLOSED)
         .options(
-            selectinload(Conversation.request),
-            selectinload(Conversation.teacher),
-            selectinload(Conversation.student)
+            joinedload(Conversation.request),
+            joinedload(Conversation.teacher),
+            joinedload(Conversation.student)
         )
         .order_by(Conversation.updated_at.desc())
     ).all()
@@ -309,9 +309,9 @@ def get_inbox_summary(
         )
         .where(Conversation.status == ConversationStatus.OPEN)
         .options(
-            selectinload(Conversation.request),
-            selectinload(Conversation.teacher),
-            selectinload(Conversation.student)
+            joinedload(Conversation.request),
+            joinedload(Conversation.teacher),
+            joinedload(Conversation.student)
         )
         .order_by(Conversation.updated_at.desc())
     ).all()
@@ -336,9 +336,9 @@ def get_full_conversation(
         select(Conversation)
         .where(Conversation.id == conversation_id)
         .options(
-            selectinload(Conversation.request).selectinload(Request.user),
-            selectinload(Conversation.teacher),
-            selectinload(Conversation.student),
+            joinedload(Conversation.request).joinedload(Request.user),
+            joinedload(Conversation.teacher),
+            joinedload(Conversation.student),
             selectinload(Conversation.messages)
         )
     ).first()
@@ -3,8 +3,8 @@ from datetime import datetime
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-from pydantic import BaseModel
+from sqlalchemy.orm import joinedload
+from pydantic import BaseModel, ConfigDict
 import logging
 import traceback
 import os
@@ -12,9 +12,9 @@ import os
 from ..database import get_session
 from ..models import Pledge, Project, User, PledgeStatus, ProjectStatus, Notification, ProjectRating
 from ..deps import get_current_user
-from ..security import STRIPE_SECRET_KEY, STRIPE_WEBHOOK_SECRET
+from ..security import STRIPE_WEBHOOK_SECRET
+from ..services.stripe_client import get_stripe
 
-stripe.api_key = STRIPE_SECRET_KEY
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
 router = APIRouter(prefix="/pledges", tags=["pledges"])
@@ -36,8 +36,7 @@ class PledgeRead(BaseModel):
     project_status: ProjectStatus
     has_rated: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PublicPledgeHistory(BaseModel):
     project_id: int
@@ -71,7 +70,7 @@ def create_pledge_checkout_session(
     session.refresh(pending_pledge)
 
     try:
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = get_stripe().v1.checkout.sessions.create(dict(
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -87,7 +86,7 @@ def create_pledge_checkout_session(
             success_url=f"{FRONTEND_URL}/student/dashboard?payment=success",
             cancel_url=f"{FRONTEND_URL}/projects/{project.id}?payment=cancelled",
             client_reference_id=str(pending_pledge.id)
-        )
+        ))
         
         pending_pledge.checkout_session_id = checkout_session.id
         session.add(pending_pledge)
@@ -104,23 +103,18 @@ def list_my_pledges(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    statement = select(Pledge).where(Pledge.user_id == current_user.id).options(selectinload(Pledge.project)).order_by(Pledge.created_at.desc())
+    statement = select(Pledge).where(Pledge.user_id == current_user.id).options(joinedload(Pledge.project)).order_by(Pledge.created_at.desc())
     pledges = session.exec(statement).all()
+    rated_project_ids = set(session.exec(
+        select(ProjectRating.project_id).where(ProjectRating.user_id == current_user.id)
+    ).all())
     
     results = []
     for p in pledges:
         project_title = p.project.title if p.project else "Unknown Project"
         project_status = p.project.status if p.project else ProjectStatus.CANCELLED
         
-        has_rated = False
-        if p.project and p.project.status == ProjectStatus.COMPLETED:
-            rating_exists = session.exec(
-                select(ProjectRating)
-                .where(ProjectRating.project_id == p.project_id)
-                .where(ProjectRating.user_id == current_user.id)
-            ).first()
-            if rating_exists:
-                has_rated = True
+        has_rated = bool(p.project and p.project.status == ProjectStatus.COMPLETED and p.project_id in rated_project_ids)
 
         results.append(PledgeRead(
             id=p.id,
@@ -139,7 +133,7 @@ def get_user_pledges(
     user_id: int,
     session: Session = Depends(get_session)
 ):
-    statement = select(Pledge).where(Pledge.user_id == user_id).options(selectinload(Pledge.project)).order_by(Pledge.created_at.desc())
+    statement = select(Pledge).where(Pledge.user_id == user_id).options(joinedload(Pledge.project)).order_by(Pledge.created_at.desc())
     pledges = session.exec(statement).all()
     
     results = []
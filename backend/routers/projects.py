@@ -1,19 +1,29 @@
+import base64
+import hashlib
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select, func
-from sqlalchemy.orm import selectinload
-from sqlalchemy import or_
+from sqlalchemy.orm import joinedload, selectinload, raiseload, aliased
+from sqlalchemy import String, and_, case, exists, insert, literal, or_, tuple_, update
 import os
 import stripe
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 import logging
-from ..database import get_session
-from ..deps import get_current_user, get_current_user_optional
-from ..models import Project, ProjectStatus, User, UserRole, Pledge, PledgeStatus, Notification, Request, RequestStatus, ProjectUpdate, ProjectRating, Video, TeacherVerification, VerificationStatus, RequestBlacklist, LanguageGroup, TeacherFollower
+from ..database import engine, get_session
+from ..deps import get_current_user, get_current_user_optional, get_current_teacher_or_admin, get_write_session, public_cache_headers, anonymous_cache_headers
+from ..models import Project, ProjectStatus, User, UserRole, Pledge, PledgeStatus, Notification, Request, RequestStatus, ProjectUpdate, ProjectRating, Video, RequestBlacklist, LanguageGroup, TeacherFollower, UserLanguageGroup
+from ..services.cache import TTLCache
+from ..services.stripe_client import get_stripe
+from ..services.verification import get_verified_languages
 from ..schemas import (
     ProjectRead, ProjectCreate, ProjectUpdateModel, UpdateCreate, UpdateRead, BackerRead, 
     LanguageLevelsRead, FilterOptionsRead, PaginatedProjectRead, MyRatingRead
@@ -21,148 +31,361 @@ from ..schemas import (
 
 logger = logging.getLogger(__name__)
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-PLATFORM_FEE_PERCENT = float(os.getenv("PLATFORM_FEE_PERCENT", "0.15"))
+# Fee in basis points, so cent amounts are split with exact integer arithmetic
+PLATFORM_FEE_BPS = round(float(os.getenv("PLATFORM_FEE_PERCENT", "0.15")) * 10_000)
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
+MAX_PAGE_SIZE = 50
+LISTING_DESCRIPTION_LENGTH = 200
+# Matches the max-age anonymous listings are served with
+ANONYMOUS_LISTING_TTL_SECONDS = 30
+# Upper bound on simultaneous Stripe refund requests, kept under Stripe's rate limits
+REFUND_CONCURRENCY = 20
+RELATED_MAX_TAGS = 10
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 class TipRequest(BaseModel):
     amount: int
 
-# Helper function to create ProjectRead from Project model
-def _create_project_read(project: Project, current_user: Optional[User], session: Session) -> ProjectRead:
-    is_backed_by_user = False
-    is_following_teacher = False
-    my_rating = None
-    if current_user:
-        pledge = session.exec(
-            select(Pledge)
-            .where(Pledge.project_id == project.id)
-            .where(Pledge.user_id == current_user.id)
-            .where(Pledge.status == PledgeStatus.CAPTURED)
-        ).first()
-        if pledge:
-            is_backed_by_user = True
-        
-        if project.teacher_id:
-            follow = session.get(TeacherFollower, (project.teacher_id, current_user.id))
-            if follow:
-                is_following_teacher = True
-        
-        if project.status == ProjectStatus.COMPLETED:
-            user_rating = session.exec(
-                select(ProjectRating)
-                .where(ProjectRating.project_id == project.id)
-                .where(ProjectRating.user_id == current_user.id)
-            ).first()
-            if user_rating:
-                my_rating = MyRatingRead(rating=user_rating.rating, comment=user_rating.comment)
-
-    is_owner = current_user and project.teacher_id == current_user.id
-
-    teacher_name = project.teacher.full_name if project.teacher else "Unknown"
-    teacher_avatar_url = project.teacher.avatar_url if project.teacher else None
-    teacher_stripe_account_id = project.teacher.stripe_account_id if project.teacher else None
-
-    # Fetch average rating and total ratings
-    avg_rating_result = session.exec(
-        select(func.avg(ProjectRating.rating), func.count(ProjectRating.id))
-        .where(ProjectRating.project_id == project.id)
-    ).first()
-    average_rating = avg_rating_result[0] if avg_rating_result and avg_rating_result[0] else None
-    total_ratings = avg_rating_result[1] if avg_rating_result and avg_rating_result[1] else 0
-
-    # Check teacher verification status and get verified languages
-    is_teacher_verified = False
-    teacher_verified_languages = []
-    if project.teacher_id:
-        verifications = session.exec(
-            select(TeacherVerification)
-            .where(TeacherVerification.teacher_id == project.teacher_id)
-            .where(TeacherVerification.status == VerificationStatus.APPROVED)
-        ).all()
-        if verifications:
-            is_teacher_verified = True
-            teacher_verified_languages = [v.language for v in verifications]
-
-    origin_request_title = None
-    origin_request_student_name = None
-    if project.origin_request_id and project.request:
-        origin_request_title = project.request.title
-        if project.request.user:
-            origin_request_student_name = project.request.user.full_name
-
-    return ProjectRead(
-        id=project.id,
-        title=project.title,
-        description=project.description,
-        language=project.language,
-        level=project.level,
-        tags=project.tags,
-        funding_goal=project.funding_goal,
-        current_funding=project.current_funding,
-        total_tipped_amount=project.total_tipped_amount,
-        deadline=project.deadline,
-        delivery_days=project.delivery_days,
-        status=project.status,
-        is_private=project.is_private,
-        created_at=project.created_at,
-        updated_at=project.updated_at,
-        funded_at=project.funded_at,
-        completed_at=project.completed_at,
-        teacher_id=project.teacher_id,
-        teacher_name=teacher_name,
-        teacher_avatar_url=teacher_avatar_url,
-        teacher_stripe_account_id=teacher_stripe_account_id,
-        teacher_verified_languages=teacher_verified_languages,
-        origin_request_id=project.origin_request_id,
-        origin_request_title=origin_request_title,
-        origin_request_student_name=origin_request_student_name,
-        videos=[video.url for video in project.videos],
-        is_backed_by_user=is_backed_by_user,
-        is_owner=is_owner,
-        is_teacher_verified=is_teacher_verified,
-        is_following_teacher=is_following_teacher,
-        average_rating=average_rating,
-        total_ratings=total_ratings,
-        my_rating=my_rating,
-        is_series=project.is_series,
-        num_videos=project.num_videos,
-        price_per_video=project.price_per_video,
-        project_image_url=project.project_image_url,
-        series_intro_video_url=project.series_intro_video_url
+def _user_project_states(rows, current_user: Optional[User], session: Session):
+    """
+    Returns the ids of the projects in `rows` backed by the current user, the ids
+    of their teachers the user follows, and the user's ratings by project id.
+    All three come from one SELECT over the page's project ids, with the
+    backer and follow checks as correlated EXISTS columns.
+    """
+    backed_ids, followed_ids, my_ratings = set(), set(), {}
+    if not current_user or not rows:
+        return backed_ids, followed_ids, my_ratings
+    statuses = {row["id"]: row["status"] for row in rows}
+
+    statement = (
+        select(
+            Project.id,
+            Project.teacher_id,
+            exists().where(
+                Pledge.project_id == Project.id,
+                Pledge.user_id == current_user.id,
+                Pledge.status == PledgeStatus.CAPTURED,
+            ).label("is_backed"),
+            exists().where(
+                TeacherFollower.teacher_id == Project.teacher_id,
+                TeacherFollower.student_id == current_user.id,
+            ).label("is_following"),
+            ProjectRating.rating,
+            ProjectRating.comment,
+        )
+        .outerjoin(ProjectRating, and_(ProjectRating.project_id == Project.id, ProjectRating.user_id == current_user.id))
+        .where(Project.id.in_(list(statuses)))
+    )
+    for project_id, teacher_id, is_backed, is_following, rating, comment in session.exec(statement):
+        if is_backed:
+            backed_ids.add(project_id)
+        if is_following:
+            followed_ids.add(teacher_id)
+        if rating is not None and statuses[project_id] == ProjectStatus.COMPLETED:
+            my_ratings[project_id] = MyRatingRead(rating=rating, comment=comment)
+    return backed_ids, followed_ids, my_ratings
+
+# Columns feeding ProjectRead, selected directly
+# instead of hydrating Project/User/Request instances for every row
+_RequestStudent = aliased(User)
+_PROJECT_LISTING_COLUMNS = (
+    Project.id, Project.title, Project.language, Project.level, Project.tags,
+    Project.funding_goal, Project.current_funding, Project.total_tipped_amount, Project.deadline,
+    Project.delivery_days, Project.status, Project.is_private, Project.created_at, Project.updated_at,
+    Project.funded_at, Project.completed_at, Project.teacher_id, Project.origin_request_id,
+    Project.average_rating, Project.total_ratings, Project.is_series, Project.num_videos,
+    Project.price_per_video, Project.project_image_url, Project.series_intro_video_url,
+    User.full_name.label("teacher_name"),
+    User.avatar_url.label("teacher_avatar_url"),
+    User.stripe_account_id.label("teacher_stripe_account_id"),
+    User.is_verified_teacher.label("is_teacher_verified"),
+    Request.title.label("origin_request_title"),
+    _RequestStudent.full_name.label("origin_request_student_name"),
+)
+
+# Built once and matching the predicates of project_active_idx / project_completed_idx
+_PUBLIC_STATUSES = (ProjectStatus.FUNDING, ProjectStatus.SUCCESSFUL)
+# States no cancellation path may leave: finished, or with the teacher's payout in flight
+_UNCANCELLABLE_STATUSES = (ProjectStatus.COMPLETED, ProjectStatus.CANCELLED, ProjectStatus.TRANSFER_PENDING)
+_PUBLIC_ACTIVE_FILTER = (Project.status.in_(_PUBLIC_STATUSES), Project.is_private == False)
+_PUBLIC_ARCHIVE_FILTER = (Project.status == ProjectStatus.COMPLETED, Project.is_private == False)
+
+def _project_search_filter(search: str):
+    """
+    Matches `search` anywhere in a project's text fields or its teacher's name.
+    The teacher arm is a subquery on project.teacher_id, so every arm of the OR
+    stays on the project table and Postgres can combine the trigram indexes.
+    """
+    search_term = f"%{search}%"
+    return or_(
+        Project.title.ilike(search_term),
+        Project.description.ilike(search_term),
+        Project.tags.ilike(search_term),
+        Project.language.ilike(search_term),
+        Project.level.ilike(search_term),
+        Project.teacher_id.in_(select(User.id).where(User.full_name.ilike(search_term)))
     )
 
+@lru_cache(maxsize=2)
+def _project_listing_query(full_description: bool = False):
+    """
+    Selects the ProjectRead columns. Listings only show the start of the
+    description, so unless `full_description` is set only a preview is read.
+    Select objects are immutable, so the joins are built once and shared;
+    callers add their filters generatively.
+    """
+    description = Project.description if full_description else func.substr(Project.description, 1, LISTING_DESCRIPTION_LENGTH).label("description")
+    return (
+        select(description, *_PROJECT_LISTING_COLUMNS)
+        .join(User, Project.teacher_id == User.id)
+        .outerjoin(Request, Project.origin_request_id == Request.id)
+        .outerjoin(_RequestStudent, Request.user_id == _RequestStudent.id)
+    )
 
-def _cancel_project_logic(project: Project, session: Session):
+def _create_project_reads_from_rows(rows, current_user: Optional[User], session: Session) -> List[ProjectRead]:
+    """
+    Builds ProjectRead models from `_PROJECT_LISTING_COLUMNS` row mappings.
+    Videos, verified languages and the current user's state are fetched for
+    the whole page at once.
+    """
+    project_ids = [row["id"] for row in rows]
+    videos = defaultdict(list)
+    if project_ids:
+        for project_id, url in session.exec(select(Video.project_id, Video.url).where(Video.project_id.in_(project_ids))):
+            videos[project_id].append(url)
+
+    backed_ids, followed_ids, my_ratings = _user_project_states(rows, current_user, session)
+    verified_languages = get_verified_languages({row["teacher_id"] for row in rows if row["is_teacher_verified"]}, session)
+
+    reads = []
+    for row in rows:
+        # Rows come straight from the database, so validation is skipped
+        reads.append(ProjectRead.model_construct(
+            **row,
+            teacher_verified_languages=verified_languages.get(row["teacher_id"], []),
+            videos=videos[row["id"]],
+            is_backed_by_user=row["id"] in backed_ids,
+            is_owner=bool(current_user and row["teacher_id"] == current_user.id),
+            is_following_teacher=row["teacher_id"] in followed_ids,
+            my_rating=my_ratings.get(row["id"]),
+        ))
+    return reads
+
+_PROJECT_LIST_ADAPTER = TypeAdapter(List[ProjectRead])
+_anonymous_listing_cache = TTLCache(ttl=ANONYMOUS_LISTING_TTL_SECONDS)
+
+def _json_response(content, response: Optional[Response] = None) -> Response:
+    """
+    Renders already-built response models straight to JSON. FastAPI would
+    otherwise validate every item against the response_model a second time.
+    Pass the injected `response` to keep headers set by dependencies.
+    """
+    body = content if isinstance(content, bytes) else content.model_dump_json().encode()
+    return Response(content=body, media_type="application/json", headers=dict(response.headers) if response else None)
+
+def _stream_project_reads(query, current_user: Optional[User], chunk_size: int = 100) -> StreamingResponse:
+    """
+    Streams an unpaginated project listing as a JSON array, rendering `chunk_size`
+    rows at a time so memory stays flat however many projects match.
+    The generator outlives the request, so it reads through its own session.
+    """
+    def chunks():
+        with Session(engine) as session:
+            yield b"["
+            separator = b""
+            for rows in session.exec(query.execution_options(yield_per=chunk_size)).mappings().partitions():
+                yield separator + _PROJECT_LIST_ADAPTER.dump_json(_create_project_reads_from_rows(rows, current_user, session))[1:-1]
+                separator = b","
+            yield b"]"
+    return StreamingResponse(chunks(), media_type="application/json")
+
+def _etag_response(body: bytes, response: Response, if_none_match: Optional[str]) -> Response:
+    """
+    Sends a rendered body with a weak ETag of its content, or a 304 when the
+    client already holds it. Ratings, videos and teacher details change without
+    touching updated_at, so the tag hashes the payload rather than a timestamp.
+    """
+    response.headers["ETag"] = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    if if_none_match == response.headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    return _json_response(body, response=response)
+
+def _encode_cursor(created_at: datetime, project_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{project_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(project_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _paginate(query, limit: int, offset: int, cursor: Optional[str]):
+    """
+    Orders a project query newest first and applies the requested page.
+    A cursor (from a previous page's `next_cursor`) seeks past the last seen row
+    instead of scanning and discarding `offset` rows.
+    """
+    query = query.order_by(Project.created_at.desc(), Project.id.desc())
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query = query.where(tuple_(Project.created_at, Project.id) < (cursor_created_at, cursor_id))
+    else:
+        query = query.offset(offset)
+    return query.limit(limit)
+
+def _listing_response(cache_key, base_query, limit: int, offset: int, cursor: Optional[str], current_user: Optional[User], session: Session, response: Response, if_none_match: Optional[str]) -> Response:
+    """
+    Renders one page of a public project listing. Anonymous pages carry no
+    per-user fields, so they are cached in-process for a few seconds; project
+    writes in this process clear the cache straight away.
+    Offset pages read the total from a `count(*) OVER ()` column in the same
+    query; cursor pages and pages past the end fall back to a COUNT query,
+    since the window only sees rows after the cursor.
+    """
+    body = _anonymous_listing_cache.get(cache_key) if current_user is None else None
+    if body is None:
+        page_query = _paginate(base_query, limit, offset, cursor)
+        if not cursor:
+            page_query = page_query.add_columns(func.count().over().label("total_count"))
+        rows = session.exec(page_query).mappings().all()
+
+        if rows and not cursor:
+            total_count = rows[0]["total_count"]
+        else:
+            count_statement = select(func.count()).select_from(base_query.subquery())
+            total_count = session.exec(count_statement).one()
+
+        body = PaginatedProjectRead.model_construct(
+            projects=_create_project_reads_from_rows(rows, current_user, session),
+            total_count=total_count,
+            next_cursor=_encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+        ).model_dump_json().encode()
+        if current_user is None:
+            _anonymous_listing_cache.set(cache_key, body)
+    return _etag_response(body, response, if_none_match)
+
+# Stripe errors worth retrying; any other rejection of a refund is final
+_TRANSIENT_STRIPE_ERRORS = (stripe.error.APIConnectionError, stripe.error.APIError, stripe.error.RateLimitError)
+
+def _refund_payment(pledge_id: int, payment_intent_id: str) -> Optional[PledgeStatus]:
+    """
+    Refunds one pledge and returns the status it should move to, or None to leave
+    it captured for a later retry.
+    """
+    try:
+        get_stripe().v1.refunds.create(dict(payment_intent=payment_intent_id), options={"idempotency_key": f"refund:{pledge_id}"})
+        return PledgeStatus.REFUNDED
+    except _TRANSIENT_STRIPE_ERRORS as e:
+        logger.error(f"Failed to refund pledge {pledge_id}, will retry: {e}")
+        return None
+    except stripe.error.StripeError as e:
+        logger.error(f"Stripe rejected the refund of pledge {pledge_id}: {e}")
+        return PledgeStatus.REFUND_FAILED
+
+def _refund_captured_pledges(pledges: List[Pledge], project_title: str, session: Session) -> List[dict]:
+    """
+    Refunds the captured pledges of a cancelled project through Stripe and marks them
+    refunded, or refund_failed where Stripe rejected the refund.
+    The Stripe calls run concurrently; the session is only touched from the calling thread.
+    Returns the notifications for the refunded backers. This function does NOT commit the session.
+    """
+    captured = [(pledge.id, pledge.payment_intent_id, pledge.user_id) for pledge in pledges if pledge.status == PledgeStatus.CAPTURED]
+    if not captured:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(REFUND_CONCURRENCY, len(captured))) as executor:
+        results = list(executor.map(_refund_payment, [pledge_id for pledge_id, _, _ in captured], [intent for _, intent, _ in captured]))
+
+    outcomes = defaultdict(list)
+    for (pledge_id, _, _), outcome in zip(captured, results):
+        if outcome is not None:
+            outcomes[outcome].append(pledge_id)
+    if outcomes[PledgeStatus.REFUND_FAILED]:
+        session.execute(
+            update(Pledge)
+            .where(Pledge.id.in_(outcomes[PledgeStatus.REFUND_FAILED]), Pledge.status == PledgeStatus.CAPTURED)
+            .values(status=PledgeStatus.REFUND_FAILED)
+        )
+    if not outcomes[PledgeStatus.REFUNDED]:
+        return []
+    # Only notify for pledges this call moved to REFUNDED; a concurrent sweep may have got there first
+    refunded_user_ids = session.execute(
+        update(Pledge)
+        .where(Pledge.id.in_(outcomes[PledgeStatus.REFUNDED]), Pledge.status == PledgeStatus.CAPTURED)
+        .values(status=PledgeStatus.REFUNDED)
+        .returning(Pledge.user_id)
+    ).scalars().all()
+    return [
+        {"user_id": user_id, "message": f"Project '{project_title}' was cancelled and you have been refunded.", "link": "/"}
+        for user_id in refunded_user_ids
+    ]
+
+def _refund_pledges_task(pledge_ids: List[int], project_title: str):
+    """
+    Background task issuing the refunds of a cancelled project once the cancellation is committed.
+    """
+    with Session(engine) as session:
+        pledges = session.exec(select(Pledge).where(Pledge.id.in_(pledge_ids))).all()
+        notifications = _refund_captured_pledges(pledges, project_title, session)
+        if notifications:
+            session.execute(insert(Notification), notifications)
+        session.commit()
+
+def _refund_stranded_pledges() -> int:
+    """
+    Refunds pledges still captured on cancelled projects: those whose refund task
+    never ran because the process stopped first, and those that hit a transient
+    Stripe error. Pledges Stripe rejected are marked refund_failed and skipped.
+    Refund idempotency keys are per pledge, so a refund Stripe already made is not repeated.
+    Returns the number of pledges refunded.
+    """
+    with Session(engine) as session:
+        stranded = session.exec(
+            select(Pledge, Project.title)
+            .join(Project, Pledge.project_id == Project.id)
+            .where(Project.status == ProjectStatus.CANCELLED, Pledge.status == PledgeStatus.CAPTURED)
+            .order_by(Pledge.project_id)
+        ).all()
+        notifications = []
+        for (_, project_title), rows in groupby(stranded, key=lambda row: (row[0].project_id, row[1])):
+            notifications += _refund_captured_pledges([pledge for pledge, _ in rows], project_title, session)
+        if notifications:
+            session.execute(insert(Notification), notifications)
+        session.commit()
+    if stranded:
+        logger.info(f"Refunded {len(notifications)} of {len(stranded)} stranded pledges")
+    return len(notifications)
+
+# What _cancel_project_logic reads: the pledges to refund and the origin request to reopen
+_CANCEL_LOADERS = (selectinload(Project.pledges), joinedload(Project.request), raiseload("*"))
+
+def _cancel_project_logic(project: Project, session: Session, background_tasks: BackgroundTasks):
     """
     Helper function to encapsulate the logic for cancelling a project.
+    The Stripe refunds run in `background_tasks` after the response is sent.
     This function does NOT commit the session.
     """
-    for pledge in project.pledges:
-        if pledge.status == PledgeStatus.CAPTURED:
-            try:
-                stripe.Refund.create(payment_intent=pledge.payment_intent_id)
-                pledge.status = PledgeStatus.REFUNDED
-                session.add(pledge)
-                notification = Notification(user_id=pledge.user_id, message=f"Project '{project.title}' was cancelled and you have been refunded.", link="/")
-                session.add(notification)
-            except stripe.error.StripeError as e:
-                logger.error(f"Failed to refund pledge {pledge.id}: {e}")
+    captured_pledges = [pledge for pledge in project.pledges if pledge.status == PledgeStatus.CAPTURED]
+    if captured_pledges:
+        background_tasks.add_task(_refund_pledges_task, [pledge.id for pledge in captured_pledges], project.title)
+    notifications = []
 
     project.status = ProjectStatus.CANCELLED
     session.add(project)
 
     if project.origin_request_id:
+        # Callers load Project.request up front, so this is an identity-map hit rather than a query
         request = session.get(Request, project.origin_request_id)
         if request:
             request.status = RequestStatus.OPEN
             request.target_teacher_id = None
             request.is_private = False
             session.add(request)
-            notification = Notification(user_id=request.user_id, message=f"Project '{project.title}' was cancelled. Your request has been reopened.", link="/requests")
-            session.add(notification)
+            notifications.append({"user_id": request.user_id, "message": f"Project '{project.title}' was cancelled. Your request has been reopened.", "link": "/requests"})
 
             # Blacklist the teacher who cancelled the project from this request
             if project.teacher_id:
@@ -172,71 +395,56 @@ def _cancel_project_logic(project: Project, session: Session):
                 )
                 session.add(blacklist_entry)
 
-@router.get("/filter-options", response_model=FilterOptionsRead)
+    # One multi-row INSERT instead of a flush per notification
+    if notifications:
+        session.execute(insert(Notification), notifications)
+
+@router.get("/filter-options", response_model=FilterOptionsRead, dependencies=[Depends(public_cache_headers)])
 def get_filter_options(session: Session = Depends(get_session)):
-    query = select(Project.language, Project.level).where(Project.status == ProjectStatus.COMPLETED).distinct()
+    # The database de-duplicates and orders the pairs, so they only need slicing per language
+    query = (
+        select(Project.language, Project.level)
+        .where(Project.status == ProjectStatus.COMPLETED)
+        .distinct()
+        .order_by(Project.language, Project.level)
+    )
     results = session.exec(query).all()
-    
-    language_levels = defaultdict(set)
-    for lang, level in results:
-        language_levels[lang].add(level)
-        
-    languages_list = [
-        LanguageLevelsRead(language=lang, levels=sorted(list(levels)))
-        for lang, levels in language_levels.items()
-    ]
-    
-    return FilterOptionsRead(languages=sorted(languages_list, key=lambda x: x.language))
 
-@router.get("/archive", response_model=PaginatedProjectRead)
+    return FilterOptionsRead(languages=[
+        LanguageLevelsRead(language=lang, levels=[level for _, level in pairs])
+        for lang, pairs in groupby(results, key=itemgetter(0))
+    ])
+
+@router.get("/archive", response_model=PaginatedProjectRead, dependencies=[Depends(anonymous_cache_headers)])
 def list_archive_projects(
+    response: Response,
     language: Optional[str] = None,
     level: Optional[str] = None,
     search: Optional[str] = None,
     limit: int = 9,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: Session = Depends(get_session)
 ):
-    base_query = select(Project).join(User, Project.teacher_id == User.id).where(Project.status == ProjectStatus.COMPLETED).where(Project.is_private == False)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    base_query = _project_listing_query().where(*_PUBLIC_ARCHIVE_FILTER)
     
     if language: base_query = base_query.where(Project.language == language)
     if level: base_query = base_query.where(Project.level == level)
     if search:
-        search_term = f"%{search}%"
-        base_query = base_query.where(or_(
-            Project.title.ilike(search_term),
-            Project.description.ilike(search_term),
-            Project.tags.ilike(search_term),
-            Project.language.ilike(search_term),
-            Project.level.ilike(search_term),
-            User.full_name.ilike(search_term)
-        ))
+        base_query = base_query.where(_project_search_filter(search))
 
-    count_statement = select(func.count()).select_from(base_query.subquery())
-    total_count = session.exec(count_statement).one()
-
-    projects_statement = base_query.options(
-        selectinload(Project.teacher),
-        selectinload(Project.request).selectinload(Request.user),
-        selectinload(Project.videos)
-    ).offset(offset).limit(limit)
-    projects = session.exec(projects_statement).all()
-    
-    return PaginatedProjectRead(
-        projects=[_create_project_read(p, current_user, session) for p in projects],
-        total_count=total_count
-    )
+    cache_key = ("archive", language, level, search, limit, offset, cursor)
+    return _listing_response(cache_key, base_query, limit, offset, cursor, current_user, session, response, if_none_match)
 
 @router.post("/", response_model=Project)
 def create_project(
     project_in: ProjectCreate,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    current_user: User = Depends(get_current_teacher_or_admin),
+    session: Session = Depends(get_write_session)
 ):
-    if current_user.role != UserRole.TEACHER and current_user.role != UserRole.ADMIN:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only teachers can create projects")
-    
     funding_goal = project_in.funding_goal
     if project_in.is_series and project_in.price_per_video and project_in.num_videos and project_in.num_videos > 0:
         funding_goal = project_in.price_per_video * project_in.num_videos
@@ -246,137 +454,107 @@ def create_project(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="price_per_video and num_videos should not be provided for non-series projects.")
 
     project = Project(
-        **project_in.dict(exclude={"funding_goal"}), 
+        **project_in.model_dump(exclude={"funding_goal"}), 
         funding_goal=funding_goal, 
         teacher_id=current_user.id, 
         status=ProjectStatus.FUNDING
     )
     session.add(project)
-    session.commit()
-    session.refresh(project)
+    session.flush()
 
     # Check if LanguageGroup exists, create if not
     language_group = session.exec(select(LanguageGroup).where(LanguageGroup.language_name == project.language)).first()
     if not language_group:
         language_group = LanguageGroup(language_name=project.language)
         session.add(language_group)
-        session.commit() # Commit to get the ID for the new group
-        session.refresh(language_group)
+        session.flush()
         logger.info(f"Created new LanguageGroup for: {language_group.language_name}")
 
 
-    # Notify followers
-    teacher = session.get(User, project.teacher_id, options=[selectinload(User.followers)])
-    for follower in teacher.followers:
-        notification = Notification(
-            user_id=follower.id,
-            message=f"Teacher {teacher.full_name} has created a new project: '{project.title}'",
-            link=f"/projects/{project.id}"
-        )
-        session.add(notification)
-
-    # Notify language group members
-    # Re-fetch language_group with members loaded after potential creation
-    language_group = session.exec(select(LanguageGroup).where(LanguageGroup.language_name == project.language).options(selectinload(LanguageGroup.members))).first()
-    if language_group:
-        for member in language_group.members:
-            if member.id != teacher.id: # Don't notify the teacher about their own project
-                notification = Notification(
-                    user_id=member.id,
-                    message=f"A new project in {project.language} has been posted: '{project.title}'",
-                    link=f"/projects/{project.id}"
-                )
-                session.add(notification)
+    # Notify followers and language group members with one multi-row INSERT
+    follower_ids = session.exec(select(TeacherFollower.student_id).where(TeacherFollower.teacher_id == current_user.id)).all()
+    member_ids = session.exec(
+        select(UserLanguageGroup.user_id)
+        .where(UserLanguageGroup.group_id == language_group.id, UserLanguageGroup.user_id != current_user.id) # Don't notify the teacher about their own project
+    ).all()
+    notifications = [
+        {"user_id": follower_id, "message": f"Teacher {current_user.full_name} has created a new project: '{project.title}'", "link": f"/projects/{project.id}"}
+        for follower_id in follower_ids
+    ] + [
+        {"user_id": member_id, "message": f"A new project in {project.language} has been posted: '{project.title}'", "link": f"/projects/{project.id}"}
+        for member_id in member_ids
+    ]
+    if notifications:
+        session.execute(insert(Notification), notifications)
     
     session.commit()
+    _anonymous_listing_cache.clear()
 
     return project
 
-@router.get("/", response_model=PaginatedProjectRead)
+@router.get("/", response_model=PaginatedProjectRead, dependencies=[Depends(anonymous_cache_headers)])
 def list_projects(
+    response: Response,
     language: Optional[str] = None,
     level: Optional[str] = None,
     search: Optional[str] = None,
     limit: int = 9,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: Session = Depends(get_session)
 ):
-    base_query = select(Project).join(User, Project.teacher_id == User.id).where(
-        (Project.status == ProjectStatus.FUNDING) | 
-        (Project.status == ProjectStatus.SUCCESSFUL)
-    ).where(
-        (Project.is_private == False)
-    )
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    base_query = _project_listing_query().where(*_PUBLIC_ACTIVE_FILTER)
 
     if language: base_query = base_query.where(Project.language == language)
     if level: base_query = base_query.where(Project.level == level)
     if search:
-        search_term = f"%{search}%"
-        base_query = base_query.where(or_(
-            Project.title.ilike(search_term),
-            Project.description.ilike(search_term),
-            Project.tags.ilike(search_term),
-            Project.language.ilike(search_term),
-            Project.level.ilike(search_term),
-            User.full_name.ilike(search_term)
-        ))
-
-    count_statement = select(func.count()).select_from(base_query.subquery())
-    total_count = session.exec(count_statement).one()
+        base_query = base_query.where(_project_search_filter(search))
 
-    projects_statement = base_query.options(
-        selectinload(Project.teacher),
-        selectinload(Project.request).selectinload(Request.user),
-        selectinload(Project.videos)
-    ).offset(offset).limit(limit)
-    projects = session.exec(projects_statement).all()
-    
-    return PaginatedProjectRead(
-        projects=[_create_project_read(p, current_user, session) for p in projects],
-        total_count=total_count
-    )
+    cache_key = ("active", language, level, search, limit, offset, cursor)
+    return _listing_response(cache_key, base_query, limit, offset, cursor, current_user, session, response, if_none_match)
 
 @router.get("/me", response_model=List[ProjectRead])
 def list_my_projects(
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    current_user: User = Depends(get_current_teacher_or_admin)
 ):
-    if current_user.role != UserRole.TEACHER and current_user.role != UserRole.ADMIN:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only teachers can list their projects")
-    
-    query = select(Project).where(Project.teacher_id == current_user.id).options(
-        selectinload(Project.teacher),
-        selectinload(Project.request).selectinload(Request.user),
-        selectinload(Project.videos)
+    return _stream_project_reads(
+        _project_listing_query()
+        .where(Project.teacher_id == current_user.id)
+        .order_by(Project.created_at.desc(), Project.id.desc()),
+        current_user,
     )
-    projects = session.exec(query).all()
-    return [_create_project_read(p, current_user, session) for p in projects]
 
-@router.get("/{project_id}", response_model=ProjectRead)
+@router.get("/{project_id}", response_model=ProjectRead, dependencies=[Depends(anonymous_cache_headers)])
 def get_project(
     project_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: Session = Depends(get_session)
 ):
-    project = session.exec(
-        select(Project)
-        .where(Project.id == project_id)
-        .options(selectinload(Project.teacher), selectinload(Project.request).selectinload(Request.user), selectinload(Project.videos))
-    ).first()
+    # Only projects visible to everyone are cached, so a hit needs no status check
+    body = _anonymous_listing_cache.get(("project", project_id)) if current_user is None else None
+    if body is None:
+        row = session.exec(_project_listing_query(full_description=True).where(Project.id == project_id)).mappings().first()
 
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        if not row:
+            raise HTTPException(status_code=404, detail="Project not found")
 
-    is_owner = current_user and project.teacher_id == current_user.id
-    is_admin = current_user and current_user.role == UserRole.ADMIN
+        is_owner = current_user and row["teacher_id"] == current_user.id
+        is_admin = current_user and current_user.role == UserRole.ADMIN
 
-    if project.status in [ProjectStatus.DRAFT, ProjectStatus.ON_HOLD] and not (is_owner or is_admin):
-        raise HTTPException(status_code=404, detail="Project not found")
-    if project.status == ProjectStatus.CANCELLED and not is_admin:
-        raise HTTPException(status_code=404, detail="Project not found")
-            
-    return _create_project_read(project, current_user, session)
+        if row["status"] in [ProjectStatus.DRAFT, ProjectStatus.ON_HOLD] and not (is_owner or is_admin):
+            raise HTTPException(status_code=404, detail="Project not found")
+        if row["status"] == ProjectStatus.CANCELLED and not is_admin:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        body = _create_project_reads_from_rows([row], current_user, session)[0].model_dump_json().encode()
+        if current_user is None:
+            _anonymous_listing_cache.set(("project", project_id), body)
+    return _etag_response(body, response, if_none_match)
 
 @router.post("/{project_id}/tip")
 def create_tip_checkout_session(
@@ -385,9 +563,7 @@ def create_tip_checkout_session(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    project = session.exec(
-        select(Project).where(Project.id == project_id).options(selectinload(Project.teacher))
-    ).first()
+    project = session.get(Project, project_id, options=[joinedload(Project.teacher), raiseload("*")])
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -398,10 +574,10 @@ def create_tip_checkout_session(
     if tip_in.amount < 100: # Minimum tip amount of 1 EUR
         raise HTTPException(status_code=400, detail="Tip amount must be at least €1.00")
 
-    application_fee = int(tip_in.amount * PLATFORM_FEE_PERCENT)
+    application_fee = tip_in.amount * PLATFORM_FEE_BPS // 10_000
 
     try:
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = get_stripe().v1.checkout.sessions.create(dict(
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -428,80 +604,86 @@ def create_tip_checkout_session(
                 "teacher_id": teacher.id,
                 "user_id": current_user.id
             }
-        )
+        ))
         return {"checkout_url": checkout_session.url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{project_id}/backers", response_model=List[BackerRead])
 def get_project_backers(project_id: int, session: Session = Depends(get_session)):
-    statement = select(User).join(Pledge).where(Pledge.project_id == project_id, Pledge.status == PledgeStatus.CAPTURED)
-    users = session.exec(statement).all()
-    return users
+    statement = (
+        select(User.id, User.full_name, User.avatar_url)
+        .join(Pledge, Pledge.user_id == User.id)
+        .where(Pledge.project_id == project_id, Pledge.status == PledgeStatus.CAPTURED)
+        .distinct()
+    )
+    return session.exec(statement).mappings().all()
 
-@router.get("/{project_id}/related", response_model=List[ProjectRead])
+@router.get("/{project_id}/related", response_model=List[ProjectRead], dependencies=[Depends(anonymous_cache_headers)])
 def get_related_projects(
     project_id: int,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-    project = session.get(Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    query = select(Project).where(
-        Project.language == project.language,
-        Project.id != project_id,
-        (Project.status == ProjectStatus.FUNDING) | (Project.status == ProjectStatus.SUCCESSFUL),
-        Project.is_private == False
-    ).options(
-        selectinload(Project.teacher),
-        selectinload(Project.request).selectinload(Request.user),
-        selectinload(Project.videos)
-    ).limit(3)
-    
-    projects = session.exec(query).all()
-    return [_create_project_read(p, current_user, session) for p in projects]
+    body = _anonymous_listing_cache.get(("related", project_id)) if current_user is None else None
+    if body is None:
+        project = session.exec(select(Project.language, Project.level, Project.tags).where(Project.id == project_id)).first()
+        if project is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        # Score candidates in the database (2 for the same level, 1 per shared tag) so only 3 rows come back.
+        # Tags are stored comma separated; wrapping them in commas lets each tag match exactly.
+        own_tags = {tag.strip().lower() for tag in (project.tags or "").split(",") if tag.strip()}
+        candidate_tags = literal(",") + func.replace(func.lower(func.coalesce(Project.tags, "")), ", ", ",", type_=String) + ","
+        score = case((Project.level == project.level, 2), else_=0)
+        for tag in sorted(own_tags)[:RELATED_MAX_TAGS]:
+            score = score + case((candidate_tags.contains(f",{tag},", autoescape=True), 1), else_=0)
+
+        query = _project_listing_query().where(
+            Project.language == project.language,
+            Project.id != project_id,
+            *_PUBLIC_ACTIVE_FILTER
+        ).order_by(score.desc(), Project.created_at.desc()).limit(3)
+
+        rows = session.exec(query).mappings().all()
+        body = _PROJECT_LIST_ADAPTER.dump_json(_create_project_reads_from_rows(rows, current_user, session))
+        if current_user is None:
+            _anonymous_listing_cache.set(("related", project_id), body)
+    return _json_response(body, response=response)
 
 @router.patch("/{project_id}", response_model=Project)
 def update_project(
     project_id: int,
     project_in: ProjectUpdateModel,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    project = session.get(Project, project_id)
+    project = session.get(Project, project_id, with_for_update=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     if project.teacher_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this project")
 
-    project_data = project_in.dict(exclude_unset=True)
+    project_data = project_in.model_dump(exclude_unset=True)
     if "funding_goal" in project_data and project_data["funding_goal"] != project.funding_goal:
         if project.status != ProjectStatus.DRAFT or project.origin_request_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot change the price of an active project or one created from a request")
 
-    for key, value in project_data.items():
-        setattr(project, key, value)
-
-    project.updated_at = datetime.utcnow()
+    project.sqlmodel_update(project_data)
     session.add(project)
     session.commit()
-    session.refresh(project)
+    _anonymous_listing_cache.clear()
     return project
 
 @router.post("/{project_id}/complete", response_model=Project)
 def complete_project(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    project = session.exec(
-        select(Project)
-        .where(Project.id == project_id)
-        .options(selectinload(Project.videos))
-    ).first()
+    project = session.get(Project, project_id, options=[selectinload(Project.videos), raiseload("*")], with_for_update=True)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -527,33 +709,39 @@ def complete_project(
     project.status = ProjectStatus.PENDING_CONFIRMATION
     session.add(project)
 
-    backers = session.exec(select(User).join(Pledge).where(Pledge.project_id == project_id, Pledge.status == PledgeStatus.CAPTURED)).all()
-    for backer in backers:
-        notification = Notification(
-            user_id=backer.id,
-            message=f"Project '{project.title}' is ready for your review. Please confirm its completion.",
-            link=f"/projects/{project.id}"
-        )
-        session.add(notification)
+    backer_ids = session.exec(
+        select(Pledge.user_id).where(Pledge.project_id == project_id, Pledge.status == PledgeStatus.CAPTURED).distinct()
+    ).all()
+    if backer_ids:
+        session.execute(insert(Notification), [
+            {
+                "user_id": backer_id,
+                "message": f"Project '{project.title}' is ready for your review. Please confirm its completion.",
+                "link": f"/projects/{project.id}"
+            }
+            for backer_id in backer_ids
+        ])
 
     session.commit()
-    session.refresh(project)
+    _anonymous_listing_cache.clear()
     return project
 
 @router.post("/{project_id}/confirm-completion", response_model=Project)
 def confirm_completion(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    project = session.get(Project, project_id)
+    project = session.get(Project, project_id, with_for_update=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    if project.status != ProjectStatus.PENDING_CONFIRMATION:
+    # A payout left in TRANSFER_PENDING by an interrupted request can be retried; the
+    # attempt's idempotency key makes Stripe return the original transfer instead of paying twice
+    if project.status not in (ProjectStatus.PENDING_CONFIRMATION, ProjectStatus.TRANSFER_PENDING):
         raise HTTPException(status_code=400, detail="Project is not awaiting confirmation.")
 
-    pledge = session.exec(select(Pledge).where(Pledge.project_id == project.id, Pledge.user_id == current_user.id, Pledge.status == PledgeStatus.CAPTURED)).first()
-    if not pledge:
+    is_backer = session.exec(select(exists().where(Pledge.project_id == project.id, Pledge.user_id == current_user.id, Pledge.status == PledgeStatus.CAPTURED))).one()
+    if not is_backer:
         raise HTTPException(status_code=403, detail="You are not a backer of this project.")
 
     if project.stripe_transfer_id:
@@ -564,53 +752,90 @@ def confirm_completion(
         raise HTTPException(status_code=400, detail="Teacher has not connected a Stripe account for payouts.")
 
     amount_collected = project.current_funding
-    platform_fee = int(amount_collected * PLATFORM_FEE_PERCENT)
+    platform_fee = amount_collected * PLATFORM_FEE_BPS // 10_000
     payout_amount = amount_collected - platform_fee
+    destination = teacher.stripe_account_id
 
+    # Claim the payout in its own short transaction so no locks are held during the Stripe call.
+    attempt = project.transfer_attempt
+    project.status = ProjectStatus.TRANSFER_PENDING
+    session.add(project)
+    session.commit()
+
+    transfer_id = None
     if payout_amount > 0:
         try:
-            transfer = stripe.Transfer.create(
+            transfer = get_stripe().v1.transfers.create(dict(
                 amount=payout_amount,
                 currency="eur",
-                destination=teacher.stripe_account_id,
-                metadata={"project_id": str(project.id)},
-            )
-            project.stripe_transfer_id = transfer.id
+                destination=destination,
+                metadata={"project_id": str(project_id)}
+            ), options={"idempotency_key": f"transfer:{project_id}:{attempt}"})
+        except stripe.error.IdempotencyError:
+            # Another confirmation is paying out under the same key right now
+            raise HTTPException(status_code=409, detail="A payout for this project is already in progress.")
+        except (stripe.error.APIConnectionError, stripe.error.APIError) as e:
+            # The transfer may or may not exist, so keep the claim and the key: confirming
+            # again replays whatever Stripe did with this attempt instead of paying twice
+            logger.error(f"Payout for project {project_id} attempt {attempt} has an unknown outcome: {e}")
+            raise HTTPException(status_code=502, detail="The payout could not be confirmed. Please confirm again to retry.")
         except stripe.error.StripeError as e:
+            # Stripe stores the error under the key, so a retry needs a new attempt.
+            # Only release our own claim, never one a concurrent confirmation has moved on.
+            session.execute(
+                update(Project)
+                .where(Project.id == project_id, Project.status == ProjectStatus.TRANSFER_PENDING, Project.transfer_attempt == attempt)
+                .values(status=ProjectStatus.PENDING_CONFIRMATION, transfer_attempt=attempt + 1)
+            )
+            session.commit()
             raise HTTPException(status_code=400, detail=f"Payout failed: {str(e)}")
-
-    project.status = ProjectStatus.COMPLETED
-    session.add(project)
+        transfer_id = transfer.id
+
+    # The row lock was released with the claim, so only complete a project that is
+    # still ours; one a concurrent confirmation already completed is left as it is
+    completed = session.execute(
+        update(Project)
+        .where(Project.id == project_id, Project.status == ProjectStatus.TRANSFER_PENDING)
+        .values(status=ProjectStatus.COMPLETED, stripe_transfer_id=transfer_id)
+    ).rowcount
+    if not completed:
+        session.rollback()
+        session.refresh(project)
+        if project.status == ProjectStatus.COMPLETED:
+            return project
+        logger.error(f"Project {project_id} left TRANSFER_PENDING as {project.status.value} during payout {transfer_id}")
+        raise HTTPException(status_code=409, detail="The project changed while its payout was in progress.")
 
     notification = Notification(
         user_id=project.teacher_id,
         message=f"Your funds for project '{project.title}' have been released.",
-        link=f"/teacher/dashboard"
+        link="/teacher/dashboard"
     )
     session.add(notification)
 
     session.commit()
-    session.refresh(project)
+    _anonymous_listing_cache.clear()
     return project
 
 @router.post("/{project_id}/cancel", response_model=Project)
 def cancel_project(
     project_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    project = session.exec(select(Project).where(Project.id == project_id).options(selectinload(Project.pledges))).first()
+    project = session.get(Project, project_id, options=_CANCEL_LOADERS, with_for_update={"of": Project})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if project.teacher_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the project owner can cancel the project")
-    if project.status == ProjectStatus.COMPLETED:
-        raise HTTPException(status_code=400, detail="Cannot cancel a completed project")
+    if project.status in _UNCANCELLABLE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Project is already {project.status.value} and cannot be cancelled.")
 
-    _cancel_project_logic(project, session)
+    _cancel_project_logic(project, session, background_tasks)
 
     session.commit()
-    session.refresh(project)
+    _anonymous_listing_cache.clear()
     return project
 
 @router.post("/{project_id}/updates", response_model=UpdateRead)
@@ -618,7 +843,7 @@ def add_project_update(
     project_id: int,
     update_in: UpdateCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     project = session.get(Project, project_id)
     if not project:
@@ -629,7 +854,6 @@ def add_project_update(
     update = ProjectUpdate(content=update_in.content, project_id=project_id)
     session.add(update)
     session.commit()
-    session.refresh(update)
     return update
 
 @router.patch("/updates/{update_id}", response_model=UpdateRead)
@@ -637,9 +861,9 @@ def edit_project_update(
     update_id: int,
     update_in: UpdateCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    db_update = session.get(ProjectUpdate, update_id, options=[selectinload(ProjectUpdate.project)])
+    db_update = session.get(ProjectUpdate, update_id, options=[joinedload(ProjectUpdate.project), raiseload("*")])
     if not db_update:
         raise HTTPException(status_code=404, detail="Update not found")
     if db_update.project.teacher_id != current_user.id:
@@ -648,10 +872,9 @@ def edit_project_update(
     db_update.content = update_in.content
     session.add(db_update)
     session.commit()
-    session.refresh(db_update)
     return db_update
 
-@router.get("/{project_id}/updates", response_model=List[UpdateRead])
+@router.get("/{project_id}/updates", response_model=List[UpdateRead], dependencies=[Depends(public_cache_headers)])
 def list_project_updates(
     project_id: int,
     session: Session = Depends(get_session)
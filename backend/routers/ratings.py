@@ -1,14 +1,18 @@
 from typing import List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
-from pydantic import BaseModel
-from sqlalchemy.orm import selectinload
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 from ..database import get_session
-from ..deps import get_current_user
+from ..deps import get_current_user, get_write_session
 from ..models import ProjectRating, User, Pledge, PledgeStatus, Project, ProjectStatus, Notification
+from ..services.ratings import sync_project_rating_summary
+from ..routers.projects import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/ratings", tags=["ratings"])
 
@@ -29,36 +33,45 @@ class RatingRead(BaseModel):
     teacher_response: Optional[str] = None
     response_created_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 @router.post("/project/{project_id}", response_model=ProjectRating)
 def rate_project(
     project_id: int,
     rating_in: RatingCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     if not (1 <= rating_in.rating <= 5):
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
 
-    project = session.get(Project, project_id)
+    # Locked so concurrent ratings of the project recompute its summary one after another
+    project = session.get(Project, project_id, with_for_update=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     if project.status != ProjectStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Only completed projects can be rated.")
 
-    pledge = session.exec(select(Pledge).where(Pledge.project_id == project_id, Pledge.user_id == current_user.id, Pledge.status == PledgeStatus.CAPTURED)).first()
-    if not pledge:
+    is_backer = session.exec(select(exists().where(Pledge.project_id == project_id, Pledge.user_id == current_user.id, Pledge.status == PledgeStatus.CAPTURED))).one()
+    if not is_backer:
         raise HTTPException(status_code=403, detail="You must be a backer to rate this project.")
 
-    existing_rating = session.exec(select(ProjectRating).where(ProjectRating.project_id == project_id, ProjectRating.user_id == current_user.id)).first()
-    if existing_rating:
-        raise HTTPException(status_code=400, detail="You have already rated this project.")
-
-    rating = ProjectRating(**rating_in.dict(), project_id=project_id, user_id=current_user.id)
+    # The unique (project_id, user_id) index rejects a second rating atomically,
+    # without a separate lookup that a concurrent request could race past
+    rating = ProjectRating(**rating_in.model_dump(), project_id=project_id, user_id=current_user.id)
     session.add(rating)
+    try:
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        # Only a clash on that index means a duplicate; anything else is a real error
+        if session.exec(select(exists().where(ProjectRating.project_id == project_id, ProjectRating.user_id == current_user.id))).one():
+            raise HTTPException(status_code=400, detail="You have already rated this project.")
+        raise
+
+    # Keep the denormalized rating summary on the project in step
+    sync_project_rating_summary([project_id], session)
     
     # Notify the teacher
     notification = Notification(
@@ -69,7 +82,6 @@ def rate_project(
     session.add(notification)
     
     session.commit()
-    session.refresh(rating)
     return rating
 
 @router.post("/{rating_id}/respond", response_model=ProjectRating)
@@ -77,11 +89,11 @@ def respond_to_rating(
     rating_id: int,
     response_in: RatingResponse,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     rating = session.exec(
         select(ProjectRating)
-        .options(selectinload(ProjectRating.project))
+        .options(joinedload(ProjectRating.project))
         .where(ProjectRating.id == rating_id)
     ).first()
 
@@ -98,16 +110,32 @@ def respond_to_rating(
     rating.response_created_at = datetime.utcnow()
     session.add(rating)
     session.commit()
-    session.refresh(rating)
     return rating
 
 @router.get("/project/{project_id}", response_model=List[RatingRead])
 def list_project_ratings(
     project_id: int,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
     session: Session = Depends(get_session)
 ):
-    statement = select(ProjectRating).where(ProjectRating.project_id == project_id).options(selectinload(ProjectRating.user)).order_by(ProjectRating.created_at.desc())
-    ratings = session.exec(statement).all()
+    """
+    Lists a project's ratings, newest first. Without `limit` every rating is
+    returned, as the project page expects; with it, pages are at most MAX_PAGE_SIZE.
+    """
+    statement = (
+        select(
+            ProjectRating.id, ProjectRating.rating, ProjectRating.comment, ProjectRating.created_at,
+            ProjectRating.user_id, ProjectRating.teacher_response, ProjectRating.response_created_at,
+            User.full_name,
+        )
+        .outerjoin(User, ProjectRating.user_id == User.id)
+        .where(ProjectRating.project_id == project_id)
+        .order_by(ProjectRating.created_at.desc(), ProjectRating.id.desc())
+        .offset(offset)
+    )
+    if limit is not None:
+        statement = statement.limit(min(limit, MAX_PAGE_SIZE))
     
     return [
         RatingRead(
@@ -116,8 +144,8 @@ def list_project_ratings(
             comment=r.comment,
             created_at=r.created_at,
             user_id=r.user_id,
-            user_name=r.user.full_name if r.user else "Anonymous",
+            user_name=r.full_name if r.full_name is not None else "Anonymous",
             teacher_response=r.teacher_response,
             response_created_at=r.response_created_at
-        ) for r in ratings
+        ) for r in session.exec(statement)
     ]
@@ -5,8 +5,8 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import or_, and_ # Import and_
+from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, and_, exists, insert # Import and_
 from pydantic import BaseModel
 
 from ..database import get_session
@@ -85,7 +85,7 @@ def create_request(
 @router.get("/", response_model=List[RequestRead])
 def list_requests(
     limit: int = 10,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
     language: Optional[str] = None,
     level: Optional[str] = None,
     current_user: User = Depends(get_current_user),
@@ -94,7 +94,7 @@ def list_requests(
     """
     List content requests.
     """
-    query = select(Request).options(selectinload(Request.user))
+    query = select(Request).options(joinedload(Request.user))
 
     # Exclude cancelled requests by default
     query = query.where(Request.status != RequestStatus.CANCELLED)
@@ -208,11 +208,10 @@ async def cancel_request(
     
     for conv in conversations:
         # Check if teacher is blacklisted for this request
-        is_blacklisted = session.exec(
-            select(RequestBlacklist)
-            .where(RequestBlacklist.request_id == request_id)
-            .where(RequestBlacklist.teacher_id == conv.teacher_id)
-        ).first()
+        is_blacklisted = session.exec(select(exists().where(
+            RequestBlacklist.request_id == request_id,
+            RequestBlacklist.teacher_id == conv.teacher_id,
+        ))).one()
 
         if is_blacklisted:
             # If blacklisted, just close the conversation and skip notifications
@@ -266,20 +265,20 @@ async def cancel_request(
             )
         else:
             # Create a standard notification
-            notification = Notification(
-                user_id=conv.teacher_id,
-                message=cancellation_message_content, # Use the same content as the message
-                is_read=False,
-                link=f"/messages/{conv.id}" # Link to the archived conversation
-            )
-            logger.debug(f"Creating notification for request cancellation: {notification.message}, link: {notification.link}")
+            notification = {
+                "user_id": conv.teacher_id,
+                "message": cancellation_message_content, # Use the same content as the message
+                "link": f"/messages/{conv.id}" # Link to the archived conversation
+            }
+            logger.debug(f"Creating notification for request cancellation: {notification['message']}, link: {notification['link']}")
             notifications_to_add.append(notification)
         
         # 3. Close the conversation in the database
         conv.status = ConversationStatus.CLOSED
         session.add(conv)
             
-    session.add_all(notifications_to_add) # Add all collected notifications
+    if notifications_to_add:
+        session.execute(insert(Notification), notifications_to_add) # Add all collected notifications in one statement
     session.commit()
     return {"ok": True, "detail": "Request cancelled and conversations archived."}
 
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from backend.database import get_session
 from backend.models import User, SubscriptionTier, PriorityCredit, PledgeStatus
 from backend.deps import get_current_user
+from backend.services.stripe_client import get_stripe
 
 logger = logging.getLogger(__name__) # Initialize logger
 
@@ -21,7 +22,6 @@ router = APIRouter(
     tags=["Subscriptions"],
 )
 
-stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
 
 # Use FRONTEND_URL for consistency with pledges router
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:3000")
@@ -58,7 +58,7 @@ async def create_checkout_session(
         else:
             pass
 
-        checkout_session = stripe.checkout.Session.create(**session_params)
+        checkout_session = get_stripe().v1.checkout.sessions.create(session_params)
         return {"url": checkout_session.url}
     except Exception as e:
         logger.error(f"Error creating checkout session: {e}")
@@ -147,7 +147,7 @@ async def stripe_webhook(
                         logger.error(f"invoice.payment_succeeded: Could not find subscription ID in invoice. Invoice ID: {invoice.id}")
                         raise HTTPException(status_code=500, detail="Subscription ID not found in invoice.")
 
-                    subscription = stripe.Subscription.retrieve(subscription_id)
+                    subscription = get_stripe().v1.subscriptions.retrieve(subscription_id)
                     plan_id = subscription.plan.id
                     
                     if plan_id == os.environ.get("STRIPE_PLUS_PRICE_ID"):
@@ -212,10 +212,10 @@ async def customer_portal(current_user: User = Depends(get_current_user)):
         if not current_user.stripe_customer_id:
              raise HTTPException(status_code=400, detail="User does not have a Stripe customer ID.")
 
-        portal_session = stripe.billing_portal.Session.create(
+        portal_session = get_stripe().v1.billing_portal.sessions.create(dict(
             customer=current_user.stripe_customer_id,
             return_url=f"{FRONTEND_URL}/settings?tab=subscription",
-        )
+        ))
         return {"url": portal_session.url}
     except Exception as e:
         logger.error(f"Error creating customer portal session for user {current_user.id}: {e}")
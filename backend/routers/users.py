@@ -2,20 +2,21 @@ import stripe
 import os
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlmodel import Session, select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy import and_, or_
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from collections import defaultdict
 
 from ..database import get_session
 from ..deps import get_current_user, get_current_user_optional
 from ..models import User, UserRole, Project, Pledge, PledgeStatus, Request, ProjectStatus, ProjectRating, TeacherVerification, VerificationStatus, VideoComment, Notification, Conversation, Message, RequestBlacklist, TeacherFollower, LanguageGroup
 from ..schemas import LanguageLevelsRead, FilterOptionsRead, PaginatedProjectRead, ProjectRead
-from ..routers.projects import _cancel_project_logic, _create_project_read
+from ..routers.projects import _cancel_project_logic, _CANCEL_LOADERS, _UNCANCELLABLE_STATUSES, _project_listing_query, _create_project_reads_from_rows, _json_response
+from ..services.stripe_client import get_stripe
+from ..services.verification import sync_teacher_verified_flag, invalidate_verified_languages
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -44,8 +45,7 @@ class UserProfile(BaseModel):
     follower_count: int = 0
     is_following: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserUpdate(BaseModel):
     full_name: Optional[str] = None
@@ -95,7 +95,7 @@ def update_me(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    user_data = user_in.dict(exclude_unset=True)
+    user_data = user_in.model_dump(exclude_unset=True)
     for key, value in user_data.items():
         setattr(current_user, key, value)
     
@@ -106,6 +106,7 @@ def update_me(
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_me(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
@@ -129,14 +130,14 @@ def delete_me(
 
     # If the user is a teacher, cancel their non-completed projects
     if current_user.role == UserRole.TEACHER:
-        teacher_projects = session.exec(
+        open_projects = session.exec(
             select(Project)
-            .where(Project.teacher_id == current_user.id)
-            .options(selectinload(Project.pledges))
+            .where(Project.teacher_id == current_user.id, Project.status.not_in(_UNCANCELLABLE_STATUSES))
+            .options(*_CANCEL_LOADERS)
+            .with_for_update(of=Project)
         ).all()
-        for project in teacher_projects:
-            if project.status not in [ProjectStatus.COMPLETED, ProjectStatus.CANCELLED]:
-                _cancel_project_logic(project, session)
+        for project in open_projects:
+            _cancel_project_logic(project, session, background_tasks)
 
     # 2. Reassign all associated data to the 'deleted@system' user
     # Projects
@@ -151,10 +152,8 @@ def delete_me(
     for request_obj in session.exec(select(Request).where(Request.user_id == current_user.id)).all():
         request_obj.user_id = deleted_user.id
         session.add(request_obj)
-    # ProjectRatings
-    for rating in session.exec(select(ProjectRating).where(ProjectRating.user_id == current_user.id)).all():
-        rating.user_id = deleted_user.id
-        session.add(rating)
+    # ProjectRatings stay with the anonymized account below: ratings are unique per
+    # (project, user), so moving them onto the shared placeholder could collide
     # VideoComments
     for comment in session.exec(select(VideoComment).where(VideoComment.user_id == current_user.id)).all():
         comment.user_id = deleted_user.id
@@ -168,6 +167,9 @@ def delete_me(
         for verification in session.exec(select(TeacherVerification).where(TeacherVerification.teacher_id == current_user.id)).all():
             verification.teacher_id = deleted_user.id
             session.add(verification)
+        # Both accounts' approved verifications changed
+        sync_teacher_verified_flag(current_user.id, session)
+        sync_teacher_verified_flag(deleted_user.id, session)
     
     # Conversations and Messages
     for conv in session.exec(select(Conversation).where(Conversation.student_id == current_user.id)).all():
@@ -198,6 +200,8 @@ def delete_me(
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
+    # A teacher's verifications now belong to the placeholder account
+    invalidate_verified_languages()
 
 @router.get("/{user_id}/profile", response_model=UserProfile)
 def get_user_profile(
@@ -298,7 +302,7 @@ def unfollow_teacher(
 def get_teacher_followers(
     teacher_id: int,
     limit: int = 10,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
     session: Session = Depends(get_session)
 ):
     teacher = session.get(User, teacher_id)
@@ -374,7 +378,7 @@ def get_user_following(
 def get_user_backed_projects(
     user_id: int,
     limit: int = 10,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: Session = Depends(get_session)
 ):
@@ -382,18 +386,17 @@ def get_user_backed_projects(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    base_query = select(Project).join(Pledge).where(Pledge.user_id == user_id)
+    base_query = _project_listing_query().join(Pledge, Pledge.project_id == Project.id).where(Pledge.user_id == user_id)
     
     count_statement = select(func.count()).select_from(base_query.subquery())
     total_count = session.exec(count_statement).one()
 
-    projects_statement = base_query.options(selectinload(Project.teacher), selectinload(Project.videos)).offset(offset).limit(limit)
-    projects = session.exec(projects_statement).all()
+    rows = session.exec(base_query.offset(offset).limit(limit)).mappings().all()
     
-    return PaginatedProjectRead(
-        projects=[_create_project_read(p, current_user, session) for p in projects],
+    return _json_response(PaginatedProjectRead.model_construct(
+        projects=_create_project_reads_from_rows(rows, current_user, session),
         total_count=total_count
-    )
+    ))
 
 @router.get("/{user_id}/completed-projects", response_model=PaginatedProjectRead)
 def get_teacher_completed_projects(
@@ -402,7 +405,7 @@ def get_teacher_completed_projects(
     level: Optional[str] = None,
     search: Optional[str] = None,
     limit: int = 10,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: Session = Depends(get_session)
 ):
@@ -410,7 +413,7 @@ def get_teacher_completed_projects(
     if not teacher or teacher.role != UserRole.TEACHER:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
-    base_query = select(Project).where(Project.teacher_id == user_id, Project.status == ProjectStatus.COMPLETED)
+    base_query = _project_listing_query().where(Project.teacher_id == user_id, Project.status == ProjectStatus.COMPLETED)
     
     if language: base_query = base_query.where(Project.language == language)
     if level: base_query = base_query.where(Project.level == level)
@@ -425,13 +428,12 @@ def get_teacher_completed_projects(
     count_statement = select(func.count()).select_from(base_query.subquery())
     total_count = session.exec(count_statement).one()
 
-    projects_statement = base_query.options(selectinload(Project.teacher), selectinload(Project.videos)).offset(offset).limit(limit)
-    projects = session.exec(projects_statement).all()
+    rows = session.exec(base_query.offset(offset).limit(limit)).mappings().all()
     
-    return PaginatedProjectRead(
-        projects=[_create_project_read(p, current_user, session) for p in projects],
+    return _json_response(PaginatedProjectRead.model_construct(
+        projects=_create_project_reads_from_rows(rows, current_user, session),
         total_count=total_count
-    )
+    ))
 
 @router.get("/{user_id}/completed-projects/filter-options", response_model=FilterOptionsRead)
 def get_teacher_completed_projects_filter_options(user_id: int, session: Session = Depends(get_session)):
@@ -469,7 +471,7 @@ def get_teacher_ratings(
         select(ProjectRating)
         .join(Project)
         .where(Project.teacher_id == teacher.id) # Corrected from user.id to teacher.id
-        .options(selectinload(ProjectRating.project))
+        .options(joinedload(ProjectRating.project))
         .order_by(ProjectRating.created_at.desc())
     )
     
@@ -512,18 +514,18 @@ def create_stripe_onboarding_link(
     
     try:
         if not current_user.stripe_account_id:
-            account = stripe.Account.create(type='express', email=current_user.email)
+            account = get_stripe().v1.accounts.create(dict(type='express', email=current_user.email))
             current_user.stripe_account_id = account.id
             session.add(current_user)
             session.commit()
             session.refresh(current_user)
         
-        account_link = stripe.AccountLink.create(
+        account_link = get_stripe().v1.account_links.create(dict(
             account=current_user.stripe_account_id,
             refresh_url=f"{FRONTEND_URL}/settings?stripe_reauth=true",
             return_url=f"{FRONTEND_URL}/teacher/dashboard?stripe_return=true",
             type="account_onboarding",
-        )
+        ))
         
         return {"onboarding_url": account_link.url}
     except stripe.error.StripeError as e:
@@ -1,11 +1,13 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
+from sqlalchemy import insert
 
 from ..database import get_session
-from ..deps import get_current_user, require_role
+from ..deps import get_current_user, require_role, get_write_session
 from ..models import TeacherVerification, User, UserRole, VerificationStatus, Notification
 from ..services.gamification import award_achievement
+from ..services.verification import sync_teacher_verified_flag, invalidate_verified_languages
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/verifications", tags=["verifications"])
@@ -39,7 +41,7 @@ def get_my_verifications(
 def submit_verification(
     verification_in: VerificationCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     """
     Allows a teacher to submit a new language verification request.
@@ -66,30 +68,27 @@ def submit_verification(
         )
 
     verification = TeacherVerification(
-        **verification_in.dict(),
+        **verification_in.model_dump(),
         teacher_id=current_user.id
     )
     session.add(verification)
 
     # Notify all admins of the new verification request
-    admins = session.exec(select(User).where(User.role == UserRole.ADMIN)).all()
-    for admin in admins:
-        notification = Notification(
-            user_id=admin.id,
-            message=f"New verification request from {current_user.full_name} for {verification.language}.",
-            link="/admin/dashboard"
-        )
-        session.add(notification)
+    admin_ids = session.exec(select(User.id).where(User.role == UserRole.ADMIN)).all()
+    if admin_ids:
+        session.execute(insert(Notification), [
+            {"user_id": admin_id, "message": f"New verification request from {current_user.full_name} for {verification.language}.", "link": "/admin/dashboard"}
+            for admin_id in admin_ids
+        ])
 
     session.commit()
-    session.refresh(verification)
     return verification
 
 @router.post("/{verification_id}/approve", response_model=TeacherVerification)
 def approve_verification(
     verification_id: int,
     admin_user: User = Depends(require_role(UserRole.ADMIN)),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     """
     Approves a teacher's verification request. (Admin only)
@@ -102,6 +101,7 @@ def approve_verification(
         raise HTTPException(status_code=400, detail="Verification is already approved.")
 
     verification.status = VerificationStatus.APPROVED
+    sync_teacher_verified_flag(verification.teacher_id, session)
     
     # Award achievement to the teacher
     teacher = session.get(User, verification.teacher_id)
@@ -110,6 +110,6 @@ def approve_verification(
 
     session.add(verification)
     session.commit()
-    session.refresh(verification)
+    invalidate_verified_languages()
     
     return verification
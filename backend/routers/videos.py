@@ -3,11 +3,12 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload, joinedload
+from pydantic import BaseModel, ConfigDict
 
 from ..database import get_session
-from ..deps import get_current_user
+from ..deps import get_current_user, get_write_session
 from ..models import Video, Project, ProjectStatus, User, Notification, Pledge, PledgeStatus, VideoComment, ProjectUpdate, VideoResource
 
 router = APIRouter(prefix="/videos", tags=["videos"])
@@ -21,8 +22,7 @@ class VideoResourceRead(BaseModel):
     title: str
     url: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class VideoCreate(BaseModel):
     project_id: int
@@ -44,8 +44,7 @@ class VideoRead(BaseModel):
     teacher_name: str
     resources: List[VideoResourceRead] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class CommentCreate(BaseModel):
     content: str
@@ -57,14 +56,13 @@ class CommentRead(BaseModel):
     user_id: int
     user_name: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 @router.post("/", response_model=Video)
 def create_video(
     video_in: VideoCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     """
     Submit a video for a funded project.
@@ -118,7 +116,7 @@ def create_video(
 
     if video_in.resources:
         for resource_in in video_in.resources:
-            resource = VideoResource(**resource_in.dict(), video_id=video.id)
+            resource = VideoResource(**resource_in.model_dump(), video_id=video.id)
             session.add(resource)
 
     # Create a project update
@@ -129,21 +127,16 @@ def create_video(
     )
     session.add(project_update)
 
-    pledges = session.exec(select(Pledge).where(Pledge.project_id == project.id, Pledge.status == PledgeStatus.CAPTURED)).all()
-
-    notified_users = set()
-    for pledge in pledges:
-        if pledge.user_id not in notified_users:
-            notification = Notification(
-                user_id=pledge.user_id,
-                message=f"New video posted in '{project.title}': {video.title}",
-                link=f"/projects/{project.id}"
-            )
-            session.add(notification)
-            notified_users.add(pledge.user_id)
+    backer_ids = session.exec(
+        select(Pledge.user_id).where(Pledge.project_id == project.id, Pledge.status == PledgeStatus.CAPTURED).distinct()
+    ).all()
+    if backer_ids:
+        session.execute(insert(Notification), [
+            {"user_id": backer_id, "message": f"New video posted in '{project.title}': {video.title}", "link": f"/projects/{project.id}"}
+            for backer_id in backer_ids
+        ])
         
     session.commit()
-    session.refresh(video)
     return video
 
 @router.post("/{video_id}/resources", response_model=VideoResourceRead)
@@ -151,25 +144,24 @@ def add_resource(
     video_id: int,
     resource_in: VideoResourceCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
-    video = session.get(Video, video_id, options=[selectinload(Video.project)])
+    video = session.get(Video, video_id, options=[joinedload(Video.project)])
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
     if video.project.teacher_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to add resources to this video")
 
-    resource = VideoResource(**resource_in.dict(), video_id=video_id)
+    resource = VideoResource(**resource_in.model_dump(), video_id=video_id)
     session.add(resource)
     session.commit()
-    session.refresh(resource)
     return resource
 
 @router.get("/", response_model=List[VideoRead])
 def list_videos(
     limit: int = 10,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
     language: Optional[str] = None,
     level: Optional[str] = None,
     teacher_id: Optional[int] = None,
@@ -187,7 +179,7 @@ def list_videos(
     if project_id: query = query.where(Video.project_id == project_id)
         
     query = query.options(
-        selectinload(Video.project).selectinload(Project.teacher),
+        joinedload(Video.project).joinedload(Project.teacher),
         selectinload(Video.resources)
     )
     
@@ -218,7 +210,7 @@ def add_comment(
     video_id: int,
     comment_in: CommentCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_write_session)
 ):
     video = session.get(Video, video_id)
     if not video:
@@ -231,7 +223,6 @@ def add_comment(
     )
     session.add(comment)
     session.commit()
-    session.refresh(comment)
     
     return CommentRead(
         id=comment.id,
@@ -246,7 +237,7 @@ def list_comments(
     video_id: int,
     session: Session = Depends(get_session)
 ):
-    statement = select(VideoComment).where(VideoComment.video_id == video_id).options(selectinload(VideoComment.user)).order_by(VideoComment.created_at.asc())
+    statement = select(VideoComment).where(VideoComment.video_id == video_id).options(joinedload(VideoComment.user)).order_by(VideoComment.created_at.asc())
     comments = session.exec(statement).all()
     
     results = []
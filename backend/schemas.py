@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from .models import UserRole, RequestStatus, MessageType, OfferStatus, ConversationStatus, ProjectStatus
 
 class RequestCreate(BaseModel):
@@ -37,8 +37,7 @@ class RequestRead(BaseModel):
     is_series: bool = False
     num_videos: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ProjectCreate(BaseModel):
     title: str
@@ -76,16 +75,14 @@ class UpdateRead(BaseModel):
     created_at: datetime
     project_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class BackerRead(BaseModel):
     id: int
     full_name: str
     avatar_url: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class LanguageLevelsRead(BaseModel):
     language: str
@@ -138,12 +135,12 @@ class ProjectRead(BaseModel):
     project_image_url: Optional[str] = None
     series_intro_video_url: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PaginatedProjectRead(BaseModel):
     projects: List[ProjectRead]
     total_count: int
+    next_cursor: Optional[str] = None
 
 class ProjectResponse(BaseModel):
     id: int
@@ -156,8 +153,7 @@ class ProjectResponse(BaseModel):
     teacher_id: int
     origin_request_id: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class CounterOffer(BaseModel):
     amount: int
@@ -189,8 +185,7 @@ class UserPublicRead(BaseModel):
     avatar_url: Optional[str] = None
     role: UserRole
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MessageRead(BaseModel):
     id: int
@@ -216,8 +211,7 @@ class MessageRead(BaseModel):
     offer_num_videos: Optional[int] = None
     offer_price_per_video: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ConversationRead(BaseModel):
     id: int
@@ -235,8 +229,7 @@ class ConversationRead(BaseModel):
     student: UserPublicRead
     messages: List[MessageRead] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ConversationSummaryRead(BaseModel):
     id: int
@@ -252,8 +245,7 @@ class ConversationSummaryRead(BaseModel):
     last_message_created_at: Optional[datetime] = None
     unread_messages_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class InboxSummary(BaseModel):
     conversations: List[ConversationSummaryRead]
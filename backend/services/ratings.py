@@ -0,0 +1,30 @@
+from typing import Iterable
+
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+from backend.models import Project, ProjectRating
+
+
+def rating_summary_values() -> dict:
+    """
+    Returns UPDATE values recomputing `Project.average_rating` and `total_ratings`
+    from the ratings of each project row being updated.
+    """
+    return {
+        "average_rating": select(func.avg(ProjectRating.rating)).where(ProjectRating.project_id == Project.id).scalar_subquery(),
+        "total_ratings": select(func.count(ProjectRating.id)).where(ProjectRating.project_id == Project.id).scalar_subquery(),
+    }
+
+
+def sync_project_rating_summary(project_ids: Iterable[int], session: Session):
+    """
+    Recomputes the denormalized rating summary of the given projects in SQL.
+    Call it after adding or removing ratings, holding the project row lock
+    where ratings can be added concurrently.
+    The project's updated_at is kept, since a rating is not an edit of the project.
+    This function does not commit the session.
+    """
+    session.execute(
+        update(Project).where(Project.id.in_(list(project_ids)))
+        .values(**rating_summary_values(), updated_at=Project.updated_at)
+    )
@@ -0,0 +1,12 @@
+from functools import lru_cache
+import stripe
+from backend.security import STRIPE_SECRET_KEY
+
+@lru_cache(maxsize=1)
+def get_stripe() -> stripe.StripeClient:
+    """
+    Returns a StripeClient holding its own API key, created once per process.
+    Unlike the global `stripe.api_key`, the client carries no module-level state,
+    so it is safe to share across worker threads.
+    """
+    return stripe.StripeClient(STRIPE_SECRET_KEY, max_network_retries=2)
@@ -0,0 +1,68 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlmodel import Session, select
+from backend.models import User, TeacherVerification, VerificationStatus
+from backend.services.cache import TTLCache
+
+# Bounds how long another worker process can serve languages from before a review
+VERIFIED_LANGUAGES_TTL_SECONDS = 300
+
+
+def sync_teacher_verified_flag(teacher_id: int, session: Session):
+    """
+    Recomputes the denormalized `User.is_verified_teacher` flag from the teacher's
+    approved verifications. Call it after changing a verification's status.
+    This function does not commit the session.
+    """
+    teacher = session.get(User, teacher_id)
+    if not teacher:
+        return
+
+    session.flush()
+    approved = session.exec(
+        select(TeacherVerification.id)
+        .where(TeacherVerification.teacher_id == teacher_id)
+        .where(TeacherVerification.status == VerificationStatus.APPROVED)
+    ).first()
+    teacher.is_verified_teacher = approved is not None
+    session.add(teacher)
+
+
+_verified_languages_cache = TTLCache(ttl=VERIFIED_LANGUAGES_TTL_SECONDS, maxsize=4096)
+
+
+def get_verified_languages(teacher_ids: Iterable[int], session: Session) -> Dict[int, List[str]]:
+    """
+    Returns the languages each teacher is verified for, cached per process.
+    Teachers missing from the cache are looked up together in one query on `session`.
+    """
+    languages = {}
+    missing = []
+    for teacher_id in set(teacher_ids):
+        cached = _verified_languages_cache.get(teacher_id)
+        if cached is None:
+            missing.append(teacher_id)
+        else:
+            languages[teacher_id] = list(cached)
+
+    if missing:
+        found = defaultdict(list)
+        for teacher_id, language in session.exec(
+            select(TeacherVerification.teacher_id, TeacherVerification.language)
+            .where(TeacherVerification.teacher_id.in_(missing))
+            .where(TeacherVerification.status == VerificationStatus.APPROVED)
+        ):
+            found[teacher_id].append(language)
+        for teacher_id in missing:
+            _verified_languages_cache.set(teacher_id, tuple(found[teacher_id]))
+            languages[teacher_id] = found[teacher_id]
+    return languages
+
+
+def invalidate_verified_languages():
+    """
+    Drops this process's cached verified languages. Call it once a verification
+    status change has been committed.
+    """
+    _verified_languages_cache.clear()
@@ -71,7 +71,7 @@ const ProjectDetail = () => {
         setReviews(reviewsRes.data);
       }
       
-      if (['in_progress', 'completed', 'successful', 'pending_confirmation'].includes(projectRes.data.status)) {
+      if (['in_progress', 'completed', 'successful', 'pending_confirmation', 'transfer_pending'].includes(projectRes.data.status)) {
           const videosRes = await client.get('/videos/', { params: { project_id: id } });
           setVideos(videosRes.data);
       }
@@ -341,6 +341,14 @@ const ProjectDetail = () => {
             </div>
           )}
 
+          {project.is_backed_by_user && project.status === 'transfer_pending' && (
+            <div className="my-6 p-4 bg-yellow-100 border-l-4 border-yellow-500 text-yellow-700">
+              <h4 className="font-bold">Payout in Progress</h4>
+              <p className="mb-2">The funds for this project are being released. If this message does not go away, retry the confirmation.</p>
+              <button onClick={handleConfirmCompletion} className="bg-green-500 text-white font-bold py-2 px-4 rounded hover:bg-green-600">Retry Confirmation</button>
+            </div>
+          )}
+
           {canRate && (
             <div ref={ratingSectionRef} className="mt-8 border-t border-gray-200 pt-8">
               <h2 className="text-2xl font-bold text-gray-900 mb-4">Your Rating</h2>
@@ -403,7 +411,7 @@ const ProjectDetail = () => {
             )}
             {project.status === 'funding' ? (token ? (<PledgeForm projectId={project.id} projectName={project.title} />) : (<div className="text-center"><p className="text-gray-600 mb-4">Log in to back this project.</p><Link to="/login" className="block w-full bg-indigo-600 text-white text-center py-2 px-4 rounded-md hover:bg-indigo-700">Login to Pledge</Link></div>)) : (<div className="bg-gray-100 p-4 rounded text-center text-gray-600">This project is {project.status.replace(/_/g, ' ')}.</div>)}
             
-            {['successful', 'completed', 'pending_confirmation'].includes(project.status) && project.teacher_stripe_account_id && (
+            {['successful', 'completed', 'pending_confirmation', 'transfer_pending'].includes(project.status) && project.teacher_stripe_account_id && (
               <div className="mt-6 pt-6 border-t border-gray-200">
                 {project.total_tipped_amount > 0 && (
                   <p className="text-sm text-gray-500 mb-3">Total tips received: {formatCurrency(project.total_tipped_amount)}</p>
@@ -113,7 +113,7 @@ const ProjectManagement = () => {
                 </td>
                 <td className="px-6 py-4 text-right whitespace-nowrap text-sm text-gray-500">€{(project.current_funding / 100).toFixed(2)} / €{(project.funding_goal / 100).toFixed(2)}</td>
                 <td className="px-6 py-4 text-right whitespace-nowrap text-sm font-medium">
-                  {project.status !== 'completed' && project.status !== 'cancelled' && (
+                  {!['completed', 'cancelled', 'transfer_pending'].includes(project.status) && (
                     <button
                       className="bg-orange-600 hover:bg-orange-700 text-white font-medium py-2 px-4 rounded-md shadow-sm"
                       onClick={() => handleCancelClick(project)}
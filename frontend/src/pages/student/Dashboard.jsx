@@ -124,7 +124,7 @@ const StudentDashboard = () => {
                     </div>
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-sm font-medium">
-                    {pledge.project_status === 'pending_confirmation' && (
+                    {['pending_confirmation', 'transfer_pending'].includes(pledge.project_status) && (
                       <button
                         onClick={() => handleConfirmCompletion(pledge.project_id)}
                         className="text-indigo-600 hover:text-indigo-900"
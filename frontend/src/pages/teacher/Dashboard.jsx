@@ -226,7 +226,7 @@ const Dashboard = () => {
                           </>
                         )}
 
-                        {project.status !== 'completed' && project.status !== 'cancelled' && (
+                        {!['completed', 'cancelled', 'transfer_pending'].includes(project.status) && (
                             <button
                               onClick={() => confirmCancelProject(project.id)}
                               className="px-2 py-1 text-xs font-semibold rounded-full bg-red-100 text-red-800 hover:bg-red-200"